@@ -0,0 +1,79 @@
+from functools import wraps
+from hashlib import blake2b
+from pathlib import Path
+from typing import Callable
+from typing import TypeVar
+import os
+import pickle
+
+import numpy as np
+
+CACHE_DIR = Path(os.environ.get("AOC_CACHE_DIR", Path(__file__).parent / ".cache"))
+
+T = TypeVar("T")
+
+
+def cache_enabled() -> bool:
+    return not os.environ.get("AOC_NO_CACHE")
+
+
+def content_hash(content: bytes) -> str:
+    return blake2b(content, digest_size=16).hexdigest()
+
+
+def _cache_stem(parse: Callable, version: int, digest: str) -> str:
+    return f"{parse.__module__}.{parse.__qualname__}-v{version}-{digest}"
+
+
+def _load(stem: str):
+    npy_path = CACHE_DIR / f"{stem}.npy"
+    if npy_path.exists():
+        return np.load(npy_path)
+    pkl_path = CACHE_DIR / f"{stem}.pkl"
+    if pkl_path.exists():
+        with open(pkl_path, "rb") as f:
+            return pickle.load(f)
+    raise FileNotFoundError(stem)
+
+
+def _store(stem: str, value) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        target = CACHE_DIR / f"{stem}.npy"
+        tmp = CACHE_DIR / f"{stem}.{os.getpid()}.tmp.npy"
+        np.save(tmp, value)
+    else:
+        target = CACHE_DIR / f"{stem}.pkl"
+        tmp = CACHE_DIR / f"{stem}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+
+
+def cached_parse(
+    version: int = 1, text: bool = False
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Cache a parser's output on disk, keyed by input content and parser version.
+
+    The wrapped parser takes a file path, or the file contents when ``text`` is
+    set. Bump ``version`` whenever the parser's output changes shape.
+    """
+
+    def decorator(parse: Callable[..., T]) -> Callable[..., T]:
+        @wraps(parse)
+        def wrapper(source, *args, **kwargs) -> T:
+            if not cache_enabled() or args or kwargs:
+                return parse(source, *args, **kwargs)
+            content = source.encode() if text else Path(source).read_bytes()
+            stem = _cache_stem(parse, version, content_hash(content))
+            try:
+                return _load(stem)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+                pass
+            value = parse(source)
+            _store(stem, value)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -1,6 +1,9 @@
 from collections import Counter
 from pathlib import Path
-import re
+
+import numpy as np
+
+from aoc.ingest import parse_integers
 
 
 def get_data(filepath: Path) -> str:
@@ -10,13 +13,8 @@ def get_data(filepath: Path) -> str:
 
 
 def parse_data(data: str) -> tuple[list[int], list[int]]:
-    l_vals, r_vals = [], []
-    for row in data.strip().split("\n"):
-        matches = re.match(r"(\d*)\s+(\d*)", row)
-        l_vals.append(int(matches.group(1)))
-        r_vals.append(int(matches.group(2)))
-    l_vals.sort()
-    r_vals.sort()
+    pairs = parse_integers(data.encode(), signed=False).reshape(-1, 2)
+    l_vals, r_vals = np.sort(pairs, axis=0).T.tolist()
     return l_vals, r_vals
 
 
@@ -34,25 +32,18 @@ def calculate_similarity(list_a: list[int], weights: dict[int, int]) -> int:
     return similarity
 
 
-def part_one():
-    fp = "data/day01.txt"
+def part_a(fp: str = "data/day01.txt") -> int:
     data_src = Path(fp)
     data = get_data(data_src)
     l_vals, r_vals = parse_data(data)
     dist = difference_of_two_lists(l_vals, r_vals)
-    print(dist)
+    return dist
 
 
-def part_two():
-    fp = "data/day01.txt"
+def part_b(fp: str = "data/day01.txt") -> int:
     data_src = Path(fp)
     data = get_data(data_src)
     l_vals, r_vals = parse_data(data)
     r_counts = Counter(r_vals)
     similarity = calculate_similarity(l_vals, r_counts)
-    print(similarity)
-
-
-if __name__ == "__main__":
-    part_one()
-    part_two()
+    return similarity
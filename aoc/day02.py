@@ -62,19 +62,17 @@ def part_b_example_1():
     print(safe)
 
 
-def part_a():
-    fp = Path(r"data/day02.txt")
+def part_a(fp: Path = Path(r"data/day02.txt")) -> int:
     data_str = get_data(fp)
     data = parse_data(data_str)
     safe = 0
     for r in data:
         if is_part_a_safe(r):
             safe += 1
-    print(safe)
+    return safe
 
 
-def part_b():
-    fp = Path(r"data/day02.txt")
+def part_b(fp: Path = Path(r"data/day02.txt")) -> int:
     data_str = get_data(fp)
     data = parse_data(data_str)
     safe = 0
@@ -84,9 +82,4 @@ def part_b():
         else:
             if is_safe_removing_one_level(r):
                 safe += 1
-    print(safe)
-
-
-if __name__ == "__main__":
-    part_a()
-    part_b()
+    return safe
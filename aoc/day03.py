@@ -1,6 +1,29 @@
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Generator
+from typing import Iterable
+import mmap
+import multiprocessing as mp
 import re
 
+INSTRUCTION_PATTERN = re.compile(rb"mul\((\d+),(\d+)\)|(do\(\))|(don't\(\))")
+# A proper prefix of an instruction, i.e. one that may still complete in the next chunk
+PARTIAL_INSTRUCTION_PATTERN = re.compile(
+    rb"m(?:u(?:l(?:\((?:\d+(?:,\d*)?)?)?)?)?|d(?:o(?:\(|n(?:'(?:t\(?)?)?)?)?"
+)
+CHUNK_SIZE = 1 << 20
+SHARDS_PER_PROCESS = 4
+
+
+@dataclass
+class ShardSummary:
+    """What a run of instructions contributes, for either starting enabled state"""
+
+    total: int  # every mul(), ignoring do() and don't()
+    enabled_total: int  # enabled mul()s if the shard starts enabled
+    disabled_total: int  # enabled mul()s if the shard starts disabled
+    final_state: bool | None  # enabled state at the end, None if never set
+
 
 def get_data(filepath: Path) -> str:
     with open(filepath, "r") as f:
@@ -8,35 +31,160 @@ def get_data(filepath: Path) -> str:
     return data
 
 
-def multiply(ops: str) -> int:
-    num_pattern = r"mul\((\d*),(\d*)\)"
-    results = re.match(num_pattern, ops)
-    return int(results.group(1)) * int(results.group(2))
+def read_chunks(
+    filepath: Path, chunk_size: int = CHUNK_SIZE, start: int = 0, stop: int = -1
+) -> Generator[bytes, None, None]:
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        while chunk := f.read(
+            chunk_size if stop < 0 else min(chunk_size, stop - f.tell())
+        ):
+            yield chunk
 
 
-def parse_and_process_mul(instructions: str) -> int:
-    mul_pattern = r"mul\(\d*,\d*\)"
+def evaluate_instructions(
+    instructions: bytes, enabled: bool = True, dos_and_donts: bool = True
+) -> tuple[int, bool]:
+    """Sum the enabled mul()s, returning the total and the final enabled state"""
     total = 0
-    for val in re.findall(mul_pattern, instructions):
-        total += multiply(val)
+    for x, y, do, _ in INSTRUCTION_PATTERN.findall(instructions):
+        if x:
+            if enabled:
+                total += int(x) * int(y)
+        elif dos_and_donts:
+            enabled = bool(do)
+    return total, enabled
+
+
+def find_incomplete_instruction(instructions: bytes) -> int:
+    """Index where a trailing, possibly incomplete instruction starts, else the length.
+
+    Every instruction starts with the only "m" or "d" it contains, so only the
+    last of those can begin an instruction that runs off the end.
+    """
+    start = max(instructions.rfind(b"m"), instructions.rfind(b"d"))
+    if start >= 0 and PARTIAL_INSTRUCTION_PATTERN.fullmatch(instructions, start):
+        return start
+    return len(instructions)
+
+
+def split_instruction_chunks(chunks: Iterable[bytes]) -> Generator[bytes, None, None]:
+    """Re-cut chunks so that no instruction is split across two of them"""
+    carry = b""
+    for chunk in chunks:
+        instructions = carry + chunk
+        split = find_incomplete_instruction(instructions)
+        yield instructions[:split]
+        carry = instructions[split:]
+    yield carry
+
+
+def process_instruction_stream(
+    chunks: Iterable[bytes], dos_and_donts: bool = True
+) -> int:
+    """Evaluate instructions chunk by chunk, in memory bounded by the chunk size.
+
+    The enabled state and any instruction split across a chunk boundary are
+    carried over into the next chunk.
+    """
+    total, enabled = 0, True
+    for instructions in split_instruction_chunks(chunks):
+        subtotal, enabled = evaluate_instructions(instructions, enabled, dos_and_donts)
+        total += subtotal
+    return total
+
+
+def summarize_instructions(chunks: Iterable[bytes]) -> ShardSummary:
+    total, before_first_switch, after_first_switch = 0, 0, 0
+    state = None
+    for instructions in split_instruction_chunks(chunks):
+        for x, y, do, _ in INSTRUCTION_PATTERN.findall(instructions):
+            if x:
+                product = int(x) * int(y)
+                total += product
+                if state is None:
+                    before_first_switch += product
+                elif state:
+                    after_first_switch += product
+            else:
+                state = bool(do)
+    return ShardSummary(
+        total, before_first_switch + after_first_switch, after_first_switch, state
+    )
+
+
+def summarize_shard(shard: tuple[Path, int, int]) -> ShardSummary:
+    fp, start, stop = shard
+    return summarize_instructions(read_chunks(fp, start=start, stop=stop))
+
+
+def combine_shard_summaries(
+    summaries: Iterable[ShardSummary], dos_and_donts: bool = True
+) -> int:
+    total, enabled = 0, True
+    for summary in summaries:
+        if not dos_and_donts:
+            total += summary.total
+            continue
+        total += summary.enabled_total if enabled else summary.disabled_total
+        if summary.final_state is not None:
+            enabled = summary.final_state
+    return total
+
+
+def find_shard_boundaries(instructions: bytes | mmap.mmap, n_shards: int) -> list[int]:
+    """Split points for ``n_shards`` roughly equal shards, none inside an instruction.
+
+    A nominal split point is moved back to the start of any instruction that
+    straddles it, which is always the last "m" or "d" before it.
+    """
+    boundaries = [0]
+    for k in range(1, n_shards):
+        boundary = max(len(instructions) * k // n_shards, boundaries[-1])
+        start = max(
+            instructions.rfind(b"m", boundaries[-1], boundary),
+            instructions.rfind(b"d", boundaries[-1], boundary),
+        )
+        if start >= 0 and PARTIAL_INSTRUCTION_PATTERN.fullmatch(
+            instructions, start, boundary
+        ):
+            boundary = start
+        boundaries.append(boundary)
+    boundaries.append(len(instructions))
+    return boundaries
+
+
+def process_instruction_shards(
+    fp: Path, dos_and_donts: bool = True, processes: int | None = None
+) -> int:
+    """Evaluate a large instruction file in parallel shards.
+
+    Each worker summarizes its shard for both possible starting enabled states,
+    and the summaries are then combined in file order.
+    """
+    processes = processes or mp.cpu_count()
+    with open(fp, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as instructions:
+            n_shards = max(
+                1, min(processes * SHARDS_PER_PROCESS, len(instructions) // CHUNK_SIZE)
+            )
+            boundaries = find_shard_boundaries(instructions, n_shards)
+    shards = [(fp, start, stop) for start, stop in zip(boundaries, boundaries[1:])]
+    if len(shards) == 1:
+        summaries = map(summarize_shard, shards)
+        return combine_shard_summaries(summaries, dos_and_donts)
+    with mp.Pool(processes=processes) as pool:
+        summaries = pool.imap(summarize_shard, shards)
+        return combine_shard_summaries(summaries, dos_and_donts)
+
+
+def parse_and_process_mul(instructions: str) -> int:
+    total, _ = evaluate_instructions(instructions.encode(), dos_and_donts=False)
     return total
 
 
 def parse_and_process_with_dos_and_donts(instructions: str) -> int:
-    do_check_pattern = r"(mul\(\d*,\d*\))|(do\(\))|(don't\(\))"
-    total = 0
-    dont_flag = False
-    for val in re.findall(do_check_pattern, instructions):
-        match val:
-            case ("", "do()", ""):
-                if dont_flag:
-                    dont_flag = False
-            case ("", "", "don't()"):
-                dont_flag = True
-            case (ops, "", ""):
-                if dont_flag:
-                    continue
-                total += multiply(ops)
+    total, _ = evaluate_instructions(instructions.encode())
     return total
 
 
@@ -46,11 +194,9 @@ def part_a_example():
     print(result)  # 161
 
 
-def part_a():
-    fp = Path(r"data/day03.txt")
-    instructions = get_data(fp)
-    result = parse_and_process_mul(instructions)
-    print(result)
+def part_a(fp: Path = Path(r"data/day03.txt")) -> int:
+    result = process_instruction_stream(read_chunks(fp), dos_and_donts=False)
+    return result
 
 
 def part_b_example():
@@ -61,15 +207,6 @@ def part_b_example():
     print(result)  # 48
 
 
-def part_b():
-    fp = Path(r"data/day03.txt")
-    instructions = get_data(fp)
-    result = parse_and_process_with_dos_and_donts(instructions)
-    print(result)
-
-
-if __name__ == "__main__":
-    part_a_example()
-    part_a()
-    part_b_example()
-    part_b()
+def part_b(fp: Path = Path(r"data/day03.txt")) -> int:
+    result = process_instruction_stream(read_chunks(fp))
+    return result
@@ -1,5 +1,9 @@
 from pathlib import Path
 
+import numpy as np
+
+from aoc.grid import Grid
+
 """
 DIRECTION REFERENCE
 
@@ -8,6 +12,17 @@ DIRECTION REFERENCE
 (-1, 1)(0, 1)(1,  1)
 """
 
+COMPASS = {
+    "north": complex(0, -1),
+    "northeast": complex(1, -1),
+    "east": complex(1, 0),
+    "southeast": complex(1, 1),
+    "south": complex(0, 1),
+    "southwest": complex(-1, 1),
+    "west": complex(-1, 0),
+    "northwest": complex(-1, -1),
+}
+
 XMAS_DIRECTIONS = {
     "north": ((complex(0, -1), "M"), (complex(0, -2), "A"), (complex(0, -3), "S")),
     "northeast": ((complex(1, -1), "M"), (complex(2, -2), "A"), (complex(3, -3), "S")),
@@ -51,41 +66,74 @@ X_MAS_DIRECTIONS = {
 }
 
 
-def load_wordsearch(fp: Path) -> dict[complex, str]:
-    result = {}
-    with open(fp, "r") as f:
-        for i, line in enumerate(f.readlines()):
-            for j, char in enumerate(line):
-                result[complex(j, i)] = char
-    return result
+def load_wordsearch(fp: Path) -> np.ndarray:
+    return Grid.from_file(fp, pad=0).to_array()
 
 
-def get_adjacent_count(
-    start: complex,
-    wordsearch: dict[complex, str],
+def word_directions(word: str) -> dict[str, tuple[tuple[complex, str], ...]]:
+    """Pattern for ``word`` read in all eight directions from its first letter"""
+    return {
+        cardinal: tuple(
+            (step * i, letter) for i, letter in enumerate(word[1:], start=1)
+        )
+        for cardinal, step in COMPASS.items()
+    }
+
+
+def count_pattern_matches(
+    wordsearch: np.ndarray,
+    anchor: str,
     pattern: dict[str, tuple[tuple[complex, str], ...]],
+    block_rows: int = 16,
 ) -> int:
+    """Count every placement of ``pattern`` around each ``anchor`` letter.
+
+    Each direction in the pattern is matched across a block of rows at once by
+    AND-ing letter masks shifted by the direction's offsets. Blocks are kept
+    small so the masks stay in cache and memory use is flat on huge searches.
+    """
+    height, width = wordsearch.shape
+    letters = {anchor} | {c for direction in pattern.values() for _, c in direction}
+    shifts = [
+        [(int(d.real), int(d.imag), c) for d, c in direction]
+        for direction in pattern.values()
+    ]
+    reach = max((max(abs(dx), abs(dy)) for s in shifts for dx, dy, _ in s), default=0)
+    window = np.zeros((block_rows + 2 * reach, width + 2 * reach), dtype=np.uint8)
+    masks = {c: np.empty(window.shape, dtype=bool) for c in letters}
+    match = np.empty((block_rows, width), dtype=bool)
     found = 0
-    for cardinal, direction in pattern.items():
-        if all(wordsearch.get(start + d) == c for d, c in direction):
-            found += 1
+    for r0 in range(0, height, block_rows):
+        n = min(block_rows, height - r0)
+        top, bottom = max(r0 - reach, 0), min(r0 + n + reach, height)
+        if top != r0 - reach or bottom != r0 + block_rows + reach:
+            window[:] = 0
+        window[top - r0 + reach : bottom - r0 + reach, reach : reach + width] = (
+            wordsearch[top:bottom]
+        )
+        for c, mask in masks.items():
+            np.equal(window, ord(c), out=mask)
+        anchors = masks[anchor][reach : reach + n, reach : reach + width]
+        for direction in shifts:
+            np.copyto(match[:n], anchors)
+            for dx, dy, c in direction:
+                match[:n] &= masks[c][
+                    reach + dy : reach + dy + n, reach + dx : reach + dx + width
+                ]
+            found += np.count_nonzero(match[:n])
     return found
 
 
-def xmas_wordsearch(wordsearch: dict[complex, str]) -> int:
-    found = 0
-    for k, v in wordsearch.items():
-        if v == "X":
-            found += get_adjacent_count(k, wordsearch, XMAS_DIRECTIONS)
-    return found
+def count_word(wordsearch: np.ndarray, word: str) -> int:
+    return count_pattern_matches(wordsearch, word[0], word_directions(word))
 
 
-def x_mas_wordsearch(wordsearch: dict[complex, str]) -> int:
-    found = 0
-    for k, v in wordsearch.items():
-        if v == "A":
-            found += get_adjacent_count(k, wordsearch, X_MAS_DIRECTIONS)
-    return found
+def xmas_wordsearch(wordsearch: np.ndarray) -> int:
+    return count_pattern_matches(wordsearch, "X", XMAS_DIRECTIONS)
+
+
+def x_mas_wordsearch(wordsearch: np.ndarray) -> int:
+    return count_pattern_matches(wordsearch, "A", X_MAS_DIRECTIONS)
 
 
 def example_part_a():
@@ -100,11 +148,10 @@ def example_part_a():
     print(found, " == 18", sep="")  # 18
 
 
-def part_a():
-    fp = Path("./data/day04.txt")
+def part_a(fp: Path = Path("./data/day04.txt")) -> int:
     wordsearch = load_wordsearch(fp)
     found = xmas_wordsearch(wordsearch)
-    print(found)
+    return found
 
 
 def example_part_b():
@@ -114,15 +161,7 @@ def example_part_b():
     print(found, " == 9", sep="")  # 9
 
 
-def part_b():
-    fp = Path("./data/day04.txt")
+def part_b(fp: Path = Path("./data/day04.txt")) -> int:
     wordsearch = load_wordsearch(fp)
     found = x_mas_wordsearch(wordsearch)
-    print(found)
-
-
-if __name__ == "__main__":
-    example_part_a()
-    example_part_b()
-    part_a()
-    part_b()
+    return found
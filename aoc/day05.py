@@ -76,8 +76,7 @@ def part_a_example_1():
     print(result, "= 143")
 
 
-def part_a():
-    fp = Path("./data/day05.txt")
+def part_a(fp: Path = Path("./data/day05.txt")) -> int:
     data = get_data(fp)
     orders, updates = parse_data(data)
     reverse_orders = reverse_order_dict(orders)
@@ -85,7 +84,7 @@ def part_a():
     for rule in updates:
         if is_correctly_ordered(rule, reverse_orders):
             result += get_middle_page_number(rule)
-    print(result)
+    return result
 
 
 def part_b_example_1():
@@ -102,8 +101,7 @@ def part_b_example_1():
     print(result, " = 123")
 
 
-def part_b():
-    fp = Path("./data/day05.txt")
+def part_b(fp: Path = Path("./data/day05.txt")) -> int:
     data = get_data(fp)
     orders, updates = parse_data(data)
     reverse_orders = reverse_order_dict(orders)
@@ -113,11 +111,4 @@ def part_b():
         if not is_correctly_ordered(rule, reverse_orders):
             new_rule = re_order_pages(rule, orders)
             result += get_middle_page_number(new_rule)
-    print(result)
-
-
-if __name__ == "__main__":
-    part_a_example_1()
-    part_a()
-    part_b_example_1()
-    part_b()
+    return result
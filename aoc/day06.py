@@ -1,36 +1,15 @@
-from dataclasses import dataclass
-from itertools import cycle
-from itertools import product
 from pathlib import Path
 
-Position = tuple[str, complex]
+import numpy as np
 
-ROTATIONS = (
-    "^",
-    ">",
-    "V",
-    "<",
-)
+from aoc.cache import cached_parse
+from aoc.grid import Grid
+from aoc.grid import SENTINEL
 
-MOVEMENT = {
-    ">": complex(1, 0),
-    "V": complex(0, 1),
-    "<": complex(-1, 0),
-    "^": complex(0, -1),
-}
+OBSTACLE = ord("#")
 
-
-@dataclass
-class Edge:
-    x_min: int
-    y_min: int
-    x_max: int
-    y_max: int
-
-    def in_bounds(self, coordinate: complex):
-        return (self.x_min <= coordinate.real < self.x_max) and (
-            self.y_min <= coordinate.imag < self.y_max
-        )
+# Directions index Grid.orthogonal_offsets, turning right is +1: ^ > V <
+NORTH = 0
 
 
 def get_data(filepath: Path) -> str:
@@ -39,120 +18,163 @@ def get_data(filepath: Path) -> str:
     return data
 
 
-def parse_data(input_value: str) -> tuple[Position, dict[complex, str], Edge]:
-    floorplan: dict[complex, str] = {}
-    start: Position | None = None
-    x = 0
-    y = 0
-    for y, line in enumerate(input_value.strip().split()):
-        for x, c in enumerate(line):
-            if c == "#":
-                floorplan[complex(x, y)] = c
-            elif c == "^":
-                start = (c, complex(x, y))
-    edges = Edge(0, 0, x + 1, y + 1)
-    return start, floorplan, edges
-
-
-def find_all_traversed_locations(
-    start: Position, floorplan: dict[complex, str], edges: Edge
-) -> set[complex]:
-    locations_seen: set[complex] = set()
-    current_position: Position = start
-    direction_cycler = cycle(ROTATIONS)
-    direction = next(direction_cycler)
-    while edges.in_bounds(current_position[1]):
-        current_direction, current_coordinate = current_position
-        locations_seen.add(current_coordinate)
-        if floorplan.get(current_coordinate + MOVEMENT[direction]) == "#":
-            direction = next(direction_cycler)
+@cached_parse(version=2, text=True)
+def parse_data(input_value: str) -> tuple[int, Grid]:
+    floorplan = Grid.from_text(input_value)
+    (start,) = floorplan.find("^")
+    return start, floorplan
+
+
+def find_all_traversed_locations(start: int, floorplan: Grid) -> set[int]:
+    cells = floorplan.buffer
+    offsets = floorplan.orthogonal_offsets
+    locations_seen: set[int] = set()
+    position, direction = start, NORTH
+    while cells[position] != SENTINEL:
+        locations_seen.add(position)
+        next_position = position + offsets[direction]
+        if cells[next_position] == OBSTACLE:
+            direction = (direction + 1) % 4
         else:
-            current_coordinate += MOVEMENT[direction]
-        current_position = (direction, current_coordinate)
+            position = next_position
     return locations_seen
 
 
+def find_guard_path(start: int, floorplan: Grid) -> list[tuple[int, int]]:
+    """The guard's (position, direction) at every step, turns included, in order"""
+    cells = floorplan.buffer
+    offsets = floorplan.orthogonal_offsets
+    path: list[tuple[int, int]] = []
+    position, direction = start, NORTH
+    while cells[position] != SENTINEL:
+        path.append((position, direction))
+        next_position = position + offsets[direction]
+        if cells[next_position] == OBSTACLE:
+            direction = (direction + 1) % 4
+        else:
+            position = next_position
+    return path
+
+
+def find_resume_states(start: int, floorplan: Grid) -> dict[int, tuple[int, int]]:
+    """The guard's state one step before it first enters each cell on its path.
+
+    An obstruction placed on a cell leaves the path up to that state unchanged,
+    so a loop check for that cell can start from there instead of ``start``.
+    """
+    resume_states: dict[int, tuple[int, int]] = {}
+    path = find_guard_path(start, floorplan)
+    for previous, (position, _) in zip(path, path[1:]):
+        if position != start and position not in resume_states:
+            resume_states[position] = previous
+    return resume_states
+
+
+def build_jump_table(floorplan: Grid) -> np.ndarray:
+    """Index of the first obstacle or sentinel reached from each cell.
+
+    The table is flat with one entry per (cell, direction), looked up as
+    ``table[cell * 4 + direction]``, so the guard can jump from turn to turn.
+    """
+    rows = floorplan.cells.reshape(-1, floorplan.stride)
+    indices = np.arange(rows.size, dtype=np.int32).reshape(rows.shape)
+    blocked = (rows == OBSTACLE) | (rows == SENTINEL)
+    ahead = np.where(blocked, indices, np.iinfo(np.int32).max)
+    behind = np.where(blocked, indices, -1)
+
+    table = np.zeros(rows.shape + (4,), dtype=np.int32)
+    north = np.maximum.accumulate(behind, axis=0)
+    table[1:, :, 0] = north[:-1]
+    east = np.minimum.accumulate(ahead[:, ::-1], axis=1)[:, ::-1]
+    table[:, :-1, 1] = east[:, 1:]
+    south = np.minimum.accumulate(ahead[::-1], axis=0)[::-1]
+    table[:-1, :, 2] = south[1:]
+    west = np.maximum.accumulate(behind, axis=1)
+    table[:, 1:, 3] = west[:, :-1]
+    return table.reshape(-1)
+
+
 def path_has_a_loop(
-    start: Position, floorplan: dict[complex, str], edges: Edge
+    start: int,
+    floorplan: Grid,
+    jumps: np.ndarray,
+    obstruction: int = -1,
+    visited: bytearray | None = None,
+    direction: int = NORTH,
 ) -> bool:
-    direction_and_locations_seen: set[Position] = set()
-    locations_seen: set[complex] = set()
-    current_position: Position = start
-    direction_cycler = cycle(ROTATIONS)
-    direction = next(direction_cycler)
-    while True:
-        if current_position in direction_and_locations_seen:
-            return True
-        if not edges.in_bounds(current_position[1]):
-            return False
-        current_direction, current_coordinate = current_position
-        direction_and_locations_seen.add(current_position)
-        locations_seen.add(current_coordinate)
-        if floorplan.get(current_coordinate + MOVEMENT[direction]) == "#":
-            direction = next(direction_cycler)
-        else:
-            current_coordinate += MOVEMENT[direction]
-        current_position = (direction, current_coordinate)
+    """Check whether the guard loops once ``obstruction`` is added to the map.
+
+    The guard starts at ``start`` facing ``direction`` and jumps between turns
+    using ``jumps`` from ``build_jump_table``. The extra obstruction is checked
+    against each jump instead of being written to the map, and turn states are
+    tracked in the ``visited`` bitset, which is left cleared on return so it can
+    be reused for the next candidate.
+    """
+    cells = floorplan.buffer
+    offsets = floorplan.orthogonal_offsets
+    table = memoryview(jumps)
+    if visited is None:
+        visited = bytearray(len(cells) // 2 + 1)
+    turns: list[int] = []
+    position = start
+    try:
+        while True:
+            step = offsets[direction]
+            block = table[position * 4 + direction]
+            distance, remainder = divmod(obstruction - position, step)
+            if not remainder and 0 < distance < (block - position) // step:
+                block = obstruction
+            elif cells[block] == SENTINEL:
+                return False
+            position = block - step
+            state = position * 4 + direction
+            byte, bit = state >> 3, 1 << (state & 7)
+            if visited[byte] & bit:
+                return True
+            visited[byte] |= bit
+            turns.append(byte)
+            direction = (direction + 1) % 4
+    finally:
+        for byte in turns:
+            visited[byte] = 0
+
+
+def get_count_of_blocking_coordinates(start: int, floorplan: Grid) -> int:
+    jumps = build_jump_table(floorplan)
+    visited = bytearray(len(floorplan.buffer) // 2 + 1)
+    loop_positions = 0
+    resume_states = find_resume_states(start, floorplan)
+    for coordinate, (position, direction) in resume_states.items():
+        if path_has_a_loop(position, floorplan, jumps, coordinate, visited, direction):
+            loop_positions += 1
+    return loop_positions
 
 
 def part_a_example():
     fp = Path("./example/day06-example-01.txt")
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    traversed_locations = find_all_traversed_locations(start, floorplan, edges)
+    start, floorplan = parse_data(data)
+    traversed_locations = find_all_traversed_locations(start, floorplan)
     print(len(traversed_locations), "= 41")
 
 
-def part_a():
-    fp = Path("./data/day06.txt")
+def part_a(fp: Path = Path("./data/day06.txt")) -> int:
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    traversed_locations = find_all_traversed_locations(start, floorplan, edges)
-    print(len(traversed_locations))
+    start, floorplan = parse_data(data)
+    traversed_locations = find_all_traversed_locations(start, floorplan)
+    return len(traversed_locations)
 
 
 def part_b_example():
     fp = Path("./example/day06-example-01.txt")
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    loop_positions = 0
-    coordinates = [
-        (coord.real, coord.imag)
-        for coord in find_all_traversed_locations(start, floorplan, edges)
-    ]
-    for x, y in coordinates:
-        coordinate = complex(x, y)
-        if coordinate == start[1] or coordinate in floorplan:
-            continue
-        new_floorplan = floorplan.copy()
-        new_floorplan[coordinate] = "#"
-        if path_has_a_loop(start, new_floorplan, edges):
-            loop_positions += 1
-    print(loop_positions)
+    start, floorplan = parse_data(data)
+    loop_positions = get_count_of_blocking_coordinates(start, floorplan)
+    print(loop_positions, "= 6")
 
 
-def part_b():
-    fp = Path("./data/day06.txt")
+def part_b(fp: Path = Path("./data/day06.txt")) -> int:
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    loop_positions = 0
-    coordinates = [
-        (coord.real, coord.imag)
-        for coord in find_all_traversed_locations(start, floorplan, edges)
-    ]
-    for x, y in coordinates:
-        coordinate = complex(x, y)
-        if coordinate == start[1] or coordinate in floorplan:
-            continue
-        new_floorplan = floorplan.copy()
-        new_floorplan[coordinate] = "#"
-        if path_has_a_loop(start, new_floorplan, edges):
-            loop_positions += 1
-    print(loop_positions)
-
-
-if __name__ == "__main__":
-    part_a_example()
-    part_a()
-    part_b_example()
-    part_b()
+    start, floorplan = parse_data(data)
+    loop_positions = get_count_of_blocking_coordinates(start, floorplan)
+    return loop_positions
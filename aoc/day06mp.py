@@ -1,162 +1,167 @@
 from dataclasses import dataclass
-from itertools import cycle
-from itertools import product
+from multiprocessing import shared_memory
 from pathlib import Path
 import multiprocessing as mp
-from functools import partial
-
-Position = tuple[str, complex]
-
-ROTATIONS = (
-    "^",
-    ">",
-    "V",
-    "<",
-)
-
-MOVEMENT = {
-    ">": complex(1, 0),
-    "V": complex(0, 1),
-    "<": complex(-1, 0),
-    "^": complex(0, -1),
-}
-
-
-@dataclass
-class Edge:
-    x_min: int
-    y_min: int
-    x_max: int
-    y_max: int
-
-    def in_bounds(self, coordinate: complex):
-        return (self.x_min <= coordinate.real < self.x_max) and (
-            self.y_min <= coordinate.imag < self.y_max
-        )
+
+import numpy as np
+
+from aoc.day06 import build_jump_table
+from aoc.day06 import find_all_traversed_locations
+from aoc.day06 import find_resume_states
+from aoc.day06 import get_data
+from aoc.day06 import parse_data
+from aoc.day06 import path_has_a_loop
+from aoc.grid import Grid
+
+CHUNKS_PER_PROCESS = 4
+
+
+@dataclass(frozen=True)
+class SharedFloorplan:
+    """Where the floorplan, jump table and candidates live in shared memory.
+
+    The block holds the grid's cells, then the int32 jump table, then int32
+    (candidate, resume position, resume direction) rows, each starting on a
+    4-byte boundary.
+    """
+
+    width: int
+    height: int
+    pad: int
+    n_cells: int
+    n_candidates: int
+
+    @property
+    def jumps_offset(self) -> int:
+        return -(-self.n_cells // 4) * 4
+
+    @property
+    def candidates_offset(self) -> int:
+        return self.jumps_offset + self.n_cells * 4 * 4
+
+    @property
+    def size(self) -> int:
+        return self.candidates_offset + self.n_candidates * 3 * 4
+
+
+# Per-worker views onto the shared block, set up by _attach_shared_floorplan
+_worker: dict[str, object] = {}
+
+
+def _attach_shared_floorplan(name: str, layout: SharedFloorplan) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    buffer = shm.buf.toreadonly()
+    _worker["shm"] = shm
+    _worker["floorplan"] = Grid(
+        buffer[: layout.n_cells], layout.width, layout.height, layout.pad
+    )
+    _worker["jumps"] = np.frombuffer(
+        buffer, np.int32, layout.n_cells * 4, layout.jumps_offset
+    )
+    _worker["candidates"] = np.frombuffer(
+        buffer, np.int32, layout.n_candidates * 3, layout.candidates_offset
+    ).reshape(-1, 3)
+    _worker["visited"] = bytearray(layout.n_cells // 2 + 1)
+
+
+def count_loops_in_range(bounds: tuple[int, int]) -> int:
+    """Count the candidates in ``candidates[lo:hi]`` that trap the guard in a loop"""
+    lo, hi = bounds
+    floorplan, jumps, candidates, visited = (
+        _worker["floorplan"],
+        _worker["jumps"],
+        _worker["candidates"],
+        _worker["visited"],
+    )
+    loop_positions = 0
+    for coordinate, position, direction in candidates[lo:hi].tolist():
+        if path_has_a_loop(position, floorplan, jumps, coordinate, visited, direction):
+            loop_positions += 1
+    return loop_positions
 
 
-def get_data(filepath: Path) -> str:
-    with open(filepath, "r") as f:
-        data = f.read()
-    return data
-
-
-def parse_data(input_value: str) -> tuple[Position, dict[complex, str], Edge]:
-    floorplan: dict[complex, str] = {}
-    start: Position | None = None
-    x = 0
-    y = 0
-    for y, line in enumerate(input_value.strip().split()):
-        for x, c in enumerate(line):
-            if c == "#":
-                floorplan[complex(x, y)] = c
-            elif c == "^":
-                start = (c, complex(x, y))
-    edges = Edge(0, 0, x + 1, y + 1)
-    return start, floorplan, edges
-
-
-def find_all_traversed_locations(
-    start: Position, floorplan: dict[complex, str], edges: Edge
-) -> set[complex]:
-    locations_seen: set[complex] = set()
-    current_position: Position = start
-    direction_cycler = cycle(ROTATIONS)
-    direction = next(direction_cycler)
-    while edges.in_bounds(current_position[1]):
-        current_direction, current_coordinate = current_position
-        locations_seen.add(current_coordinate)
-        if floorplan.get(current_coordinate + MOVEMENT[direction]) == "#":
-            direction = next(direction_cycler)
-        else:
-            current_coordinate += MOVEMENT[direction]
-        current_position = (direction, current_coordinate)
-    return locations_seen
-
-
-def path_has_a_loop(
-    start: Position, floorplan: dict[complex, str], edges: Edge
-) -> bool:
-    direction_and_locations_seen: set[Position] = set()
-    locations_seen: set[complex] = set()
-    current_position: Position = start
-    direction_cycler = cycle(ROTATIONS)
-    direction = next(direction_cycler)
-    while True:
-        if current_position in direction_and_locations_seen:
-            return True
-        if not edges.in_bounds(current_position[1]):
-            return False
-        current_direction, current_coordinate = current_position
-        direction_and_locations_seen.add(current_position)
-        locations_seen.add(current_coordinate)
-        if floorplan.get(current_coordinate + MOVEMENT[direction]) == "#":
-            direction = next(direction_cycler)
-        else:
-            current_coordinate += MOVEMENT[direction]
-        current_position = (direction, current_coordinate)
-
-
-def process_coordinate(
-    coord: tuple[int, int], start: Position, floorplan: dict[complex, str], edges: Edge
-) -> bool:
-    x, y = coord
-    coordinate = complex(x, y)
-    if coordinate == start[1] or coordinate in floorplan:
-        return False
-    new_floorplan = floorplan.copy()
-    new_floorplan[coordinate] = "#"
-    return path_has_a_loop(start, new_floorplan, edges)
-
-
-def get_count_of_blocking_coordinates(start, floorplan, edges) -> int:
-    coordinates = [
-        (coord.real, coord.imag)
-        for coord in find_all_traversed_locations(start, floorplan, edges)
-    ]
-    with mp.Pool(processes=mp.cpu_count()) as pool:
-        process_coord = partial(
-            process_coordinate, start=start, floorplan=floorplan, edges=edges
+def get_count_of_blocking_coordinates(
+    start: int, floorplan: Grid, processes: int | None = None
+) -> int:
+    """Count loop-causing obstructions across a pool sharing one copy of the map.
+
+    The floorplan, its jump table and the candidate cells with the guard state
+    to resume each check from are written once to shared memory. Workers attach
+    read-only and are sent index ranges into the candidates, returning one count
+    per range.
+    """
+    processes = processes or mp.cpu_count()
+    candidates = np.array(
+        [
+            (coordinate, position, direction)
+            for coordinate, (position, direction) in find_resume_states(
+                start, floorplan
+            ).items()
+        ],
+        dtype=np.int32,
+    ).reshape(-1, 3)
+    jumps = build_jump_table(floorplan)
+    n_cells = len(floorplan.buffer)
+    layout = SharedFloorplan(
+        floorplan.width,
+        floorplan.height,
+        floorplan.pad,
+        n_cells,
+        len(candidates),
+    )
+    shm = shared_memory.SharedMemory(create=True, size=layout.size)
+    try:
+        shm.buf[:n_cells] = floorplan.buffer
+        shared_jumps = np.frombuffer(shm.buf, np.int32, len(jumps), layout.jumps_offset)
+        shared_jumps[:] = jumps
+        shared_candidates = np.frombuffer(
+            shm.buf, np.int32, candidates.size, layout.candidates_offset
         )
-        results = pool.map(process_coord, coordinates)
-    loop_positions = sum(results)
+        shared_candidates[:] = candidates.ravel()
+        del shared_jumps, shared_candidates
+
+        chunk_size = max(1, -(-len(candidates) // (processes * CHUNKS_PER_PROCESS)))
+        chunks = [
+            (lo, min(lo + chunk_size, len(candidates)))
+            for lo in range(0, len(candidates), chunk_size)
+        ]
+        with mp.Pool(
+            processes=processes,
+            initializer=_attach_shared_floorplan,
+            initargs=(shm.name, layout),
+        ) as pool:
+            loop_positions = sum(pool.imap_unordered(count_loops_in_range, chunks))
+    finally:
+        shm.close()
+        shm.unlink()
     return loop_positions
 
 
 def example_part_a():
     fp = Path("./example/day06-example-01.txt")
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    traversed_locations = find_all_traversed_locations(start, floorplan, edges)
+    start, floorplan = parse_data(data)
+    traversed_locations = find_all_traversed_locations(start, floorplan)
     print(len(traversed_locations), "= 41")
 
 
-def part_a():
-    fp = Path("./data/day06.txt")
+def part_a(fp: Path = Path("./data/day06.txt")) -> int:
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    traversed_locations = find_all_traversed_locations(start, floorplan, edges)
-    print(len(traversed_locations))
+    start, floorplan = parse_data(data)
+    traversed_locations = find_all_traversed_locations(start, floorplan)
+    return len(traversed_locations)
 
 
 def example_part_b():
     fp = Path("./example/day06-example-01.txt")
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    loop_positions = get_count_of_blocking_coordinates(start, floorplan, edges)
+    start, floorplan = parse_data(data)
+    loop_positions = get_count_of_blocking_coordinates(start, floorplan)
     print(loop_positions, "= 6")
 
 
-def part_b():
-    fp = Path("./data/day06.txt")
+def part_b(fp: Path = Path("./data/day06.txt")) -> int:
     data = get_data(fp)
-    start, floorplan, edges = parse_data(data)
-    loop_positions = get_count_of_blocking_coordinates(start, floorplan, edges)
-    print(loop_positions)
-
-
-if __name__ == "__main__":
-    example_part_a()
-    part_a()
-    example_part_b()
-    part_b()
+    start, floorplan = parse_data(data)
+    loop_positions = get_count_of_blocking_coordinates(start, floorplan)
+    return loop_positions
@@ -1,11 +1,19 @@
+from functools import partial
 from typing import Callable
 from typing import Iterable
+from typing import Mapping
 from typing import Sequence
 from operator import add
 from operator import mul
+import multiprocessing as mp
 
+Equation = tuple[int, tuple[int, ...]]
+InverseOperation = Callable[[int, int], int | None]
 
-def parse_data(fp: str) -> list[tuple[int, tuple[int, ...]], ...]:
+CHUNKS_PER_PROCESS = 16
+
+
+def parse_data(fp: str) -> list[Equation]:
     out = []
     with open(fp, "r") as f:
         for line in f.readlines():
@@ -16,50 +24,148 @@ def parse_data(fp: str) -> list[tuple[int, tuple[int, ...]], ...]:
     return out
 
 
+def digit_shift(y: int) -> int:
+    """Smallest power of ten greater than y, i.e. 10 ** len(str(y))"""
+    shift = 10
+    while shift <= y:
+        shift *= 10
+    return shift
+
+
 def conc(x: int, y: int) -> int:
     """Concatenate two integers"""
-    return int(str(x) + str(y))
+    return x * digit_shift(y) + y
+
+
+def unadd(target: int, y: int) -> int | None:
+    return target - y if target >= y else None
+
+
+def unmul(target: int, y: int) -> int | None:
+    return target // y if y and not target % y else None
+
+
+def unconc(target: int, y: int) -> int | None:
+    shift = digit_shift(y)
+    return target // shift if target % shift == y else None
+
+
+INVERSE_OPERATIONS: dict[Callable, InverseOperation] = {
+    add: unadd,
+    mul: unmul,
+    conc: unconc,
+}
+
+
+def is_valid_equation(
+    target: int, nums: Sequence[int], inverse_ops: Sequence[InverseOperation]
+) -> bool:
+    """Search backwards from the target, undoing the last operand at each step.
+
+    An inverse returns None when its operator cannot have produced the target
+    (not divisible, wrong suffix, overshoot), which prunes that whole branch.
+    """
+
+    def _reaches(target: int, i: int) -> bool:
+        if i == 0:
+            return target == nums[0]
+        for inverse in inverse_ops:
+            previous = inverse(target, nums[i])
+            if previous is not None and _reaches(previous, i - 1):
+                return True
+        return False
+
+    return _reaches(target, len(nums) - 1)
+
+
+def is_valid_equation_forward(
+    target: int, nums: Sequence[int], ops: Sequence[Callable]
+) -> bool:
+    """Try every operator left to right, for operators with no known inverse"""
+
+    def _reaches(lop: int, i: int) -> bool:
+        if i == len(nums):
+            return lop == target
+        if lop > target:
+            return False
+        return any(_reaches(op(lop, nums[i]), i + 1) for op in ops)
+
+    return _reaches(nums[0], 1)
+
+
+def make_equation_validator(
+    ops: Iterable[Callable],
+    inverses: Mapping[Callable, InverseOperation] = INVERSE_OPERATIONS,
+) -> Callable[[int, Sequence[int]], bool]:
+    """Reverse search when every operator has an inverse, forward search otherwise"""
+    ops = tuple(ops)
+    if all(op in inverses for op in ops):
+        return partial(is_valid_equation, inverse_ops=tuple(inverses[op] for op in ops))
+    return partial(is_valid_equation_forward, ops=ops)
 
 
 def count_valid_operator_configurations(
-    equations: list[tuple[int, tuple[int, ...]], ...],
+    equations: list[Equation],
     ops: Iterable[Callable] = (add, mul),
+    inverses: Mapping[Callable, InverseOperation] = INVERSE_OPERATIONS,
 ) -> int:
-    def _valid_configuration(
-        target: int,
-        lop: int,
-        rops: Sequence[int],
-        ops: Iterable[Callable],
-    ) -> int:
-        if target == lop and not rops:
-            return 1
-        if lop > target or not rops:
-            return False
-        for op in ops:
-            new_lop = op(lop, rops[0])
-            new_rops = tuple(rops[1:])
-            if _valid_configuration(target, new_lop, new_rops, ops=ops):
-                return True
-
+    is_valid = make_equation_validator(ops, inverses)
     total_valid_configurations = 0
-    for eq in equations:
-        target, nums = eq
-        lops, nums = nums[0], tuple(nums[1:])
-        if _valid_configuration(target, lops, nums, ops=ops):
+    for target, nums in equations:
+        if is_valid(target, nums):
             total_valid_configurations += target
     return total_valid_configurations
 
 
+def _check_equation_chunk(
+    chunk: list[tuple[int, Equation]],
+    ops: tuple[Callable, ...],
+    inverses: Mapping[Callable, InverseOperation],
+) -> list[tuple[int, bool]]:
+    is_valid = make_equation_validator(ops, inverses)
+    return [(i, is_valid(target, nums)) for i, (target, nums) in chunk]
+
+
+def check_equations_in_parallel(
+    equations: Sequence[Equation],
+    ops: Iterable[Callable] = (add, mul),
+    inverses: Mapping[Callable, InverseOperation] = INVERSE_OPERATIONS,
+    processes: int | None = None,
+) -> tuple[list[bool], int]:
+    """Check equations across a process pool.
+
+    Returns whether each equation is valid, in input order, and the sum of the
+    valid targets. Equations are sent in chunks, longest first, because the
+    search grows with the number of operands and the longest ones should not
+    be left to run alone at the end.
+    """
+    processes = processes or mp.cpu_count()
+    by_length = sorted(
+        enumerate(equations), key=lambda item: len(item[1][1]), reverse=True
+    )
+    chunk_size = max(1, -(-len(by_length) // (processes * CHUNKS_PER_PROCESS)))
+    chunks = [
+        by_length[i : i + chunk_size] for i in range(0, len(by_length), chunk_size)
+    ]
+    valid = [False] * len(equations)
+    check_chunk = partial(_check_equation_chunk, ops=tuple(ops), inverses=inverses)
+    with mp.Pool(processes=processes) as pool:
+        for results in pool.imap_unordered(check_chunk, chunks):
+            for i, is_valid in results:
+                valid[i] = is_valid
+    total = sum(target for (target, _), ok in zip(equations, valid) if ok)
+    return valid, total
+
+
 def part_a_example1():
     fp = "./example/day07-example01.txt"
     data = parse_data(fp)
     print(count_valid_operator_configurations(data), "= 3749")
 
 
-def part_a():
-    fp = "./data/day07.txt"
+def part_a(fp: str = "./data/day07.txt") -> int:
     data = parse_data(fp)
-    print(count_valid_operator_configurations(data), "= 5540634308362")
+    return count_valid_operator_configurations(data)
 
 
 def part_b_example1():
@@ -68,17 +174,6 @@ def part_b_example1():
     print(count_valid_operator_configurations(data, ops=(add, mul, conc)), "= 11387")
 
 
-def part_b():
-    fp = "./data/day07.txt"
+def part_b(fp: str = "./data/day07.txt") -> int:
     data = parse_data(fp)
-    print(
-        count_valid_operator_configurations(data, ops=(add, mul, conc)),
-        "= 472290821152397",
-    )
-
-
-if __name__ == "__main__":
-    part_a_example1()
-    part_a()
-    part_b_example1()
-    part_b()
+    return count_valid_operator_configurations(data, ops=(add, mul, conc))
@@ -1,32 +1,25 @@
 from collections import defaultdict
-from dataclasses import dataclass
 from itertools import permutations
 
+import numpy as np
 
-@dataclass
-class Bounds:
-    x_min: int
-    x_max: int
-    y_min: int
-    y_max: int
+from aoc.grid import Grid
+from aoc.grid import SENTINEL
 
-    def in_bounds(self, coordinate: complex) -> bool:
-        return (
-            self.x_min <= coordinate.real < self.x_max
-            and self.y_min <= coordinate.imag < self.y_max
-        )
 
-
-def parse_data(fp) -> tuple[dict[str, set[complex]], Bounds]:
+def parse_data(fp) -> tuple[dict[str, set[complex]], Grid]:
     data = defaultdict(set)
-    with open(fp, "r") as f:
-        rows = f.readlines()
-    for y, row in enumerate(rows):
-        for x, col in enumerate(row.strip()):
-            if col != ".":
-                data[col].add(complex(x, y))
-    bounds = Bounds(0, len(rows[0].strip()), 0, len(rows))
-    return data, bounds
+    grid = Grid.from_file(fp)
+    for frequency in np.unique(grid.cells).tolist():
+        if frequency in (SENTINEL, ord(".")):
+            continue
+        for index in grid.find(chr(frequency)):
+            data[chr(frequency)].add(complex(*grid.position(index)))
+    return data, grid
+
+
+def in_bounds(coordinate: complex, grid: Grid) -> bool:
+    return grid.contains(int(coordinate.real), int(coordinate.imag))
 
 
 def compute_distance(pos1: complex, pos2: complex) -> complex:
@@ -45,19 +38,19 @@ def compute_next_position(position: complex, distance: complex) -> complex:
 
 
 def get_antinode_positions(
-    node_map: dict[str, set[complex]], bounds: Bounds
+    node_map: dict[str, set[complex]], grid: Grid
 ) -> set[complex]:
     antinode_positions: set[complex] = set()
     for k, v in node_map.items():
         for pair in permutations(v, 2):
             new_antinode_position = compute_antinode_position(pair)
-            if bounds.in_bounds(new_antinode_position):
+            if in_bounds(new_antinode_position, grid):
                 antinode_positions.add(new_antinode_position)
     return antinode_positions
 
 
 def get_resonant_antinode_positions(
-    node_map: dict[str, set[complex]], bounds: Bounds
+    node_map: dict[str, set[complex]], grid: Grid
 ) -> set[complex]:
     antinode_positions: set[complex] = set()
     for k, v in node_map.items():
@@ -67,7 +60,7 @@ def get_resonant_antinode_positions(
             current_position = pair[1]
             while True:
                 current_position += distance
-                if bounds.in_bounds(current_position):
+                if in_bounds(current_position, grid):
                     antinode_positions.add(current_position)
                 else:
                     break
@@ -88,44 +81,35 @@ def part_a_example():
     assert antinode_position == complex(4, 4)
 
     fp = "./example/day08-example01.txt"
-    node_map, bounds = parse_data(fp)
-    antinode_positions = get_antinode_positions(node_map, bounds)
+    node_map, grid = parse_data(fp)
+    antinode_positions = get_antinode_positions(node_map, grid)
     print(len(antinode_positions), "= 2")
 
     fp = "./example/day08-example02.txt"
-    node_map, bounds = parse_data(fp)
-    antinode_positions = get_antinode_positions(node_map, bounds)
+    node_map, grid = parse_data(fp)
+    antinode_positions = get_antinode_positions(node_map, grid)
     print(len(antinode_positions), "= 14")
 
 
-def part_a():
-    fp = "./data/day08.txt"
-    node_map, bounds = parse_data(fp)
-    antinode_positions = get_antinode_positions(node_map, bounds)
-    print(len(antinode_positions))
+def part_a(fp: str = "./data/day08.txt") -> int:
+    node_map, grid = parse_data(fp)
+    antinode_positions = get_antinode_positions(node_map, grid)
+    return len(antinode_positions)
 
 
 def part_b_example():
     fp = "./example/day08-example02.txt"
-    node_map, bounds = parse_data(fp)
-    antinode_positions = get_resonant_antinode_positions(node_map, bounds)
+    node_map, grid = parse_data(fp)
+    antinode_positions = get_resonant_antinode_positions(node_map, grid)
     print(len(antinode_positions), "= 34")
 
     fp = "./example/day08-example03.txt"
-    node_map, bounds = parse_data(fp)
-    antinode_positions = get_resonant_antinode_positions(node_map, bounds)
+    node_map, grid = parse_data(fp)
+    antinode_positions = get_resonant_antinode_positions(node_map, grid)
     print(len(antinode_positions), "= 9")
 
 
-def part_b():
-    fp = "./data/day08.txt"
-    node_map, bounds = parse_data(fp)
-    antinode_positions = get_resonant_antinode_positions(node_map, bounds)
-    print(len(antinode_positions))
-
-
-if __name__ == "__main__":
-    # part_a_example()
-    part_a()
-    # part_b_example()
-    part_b()
+def part_b(fp: str = "./data/day08.txt") -> int:
+    node_map, grid = parse_data(fp)
+    antinode_positions = get_resonant_antinode_positions(node_map, grid)
+    return len(antinode_positions)
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
-from collections import deque
+from heapq import heappop
+from heapq import heappush
 from more_itertools import chunked
 from typing import Iterable
+from typing import Iterator
 
 
 @dataclass
@@ -11,6 +13,12 @@ class Disk:
     free: int = 0
 
 
+# (file id, first block, length)
+FileRun = tuple[int, int, int]
+
+MAX_SPAN = 9
+
+
 def parse_data(fp: str) -> list[Disk]:
     disk_space = []
     with open(fp, "r") as f:
@@ -26,62 +34,94 @@ def checksum(files: Iterable[int | None]) -> int:
     return checksum_value
 
 
-def defragment_disk_blocks(disk_space=list[Disk]) -> deque[int]:
-    output_queue = deque()
-    disk_space = deque(disk_space)
-    while disk_space:
-        left_file = disk_space.popleft()
-        for i in range(left_file.files):
-            output_queue.append(left_file.idx)
-        while disk_space and left_file.free:
-            right_file = disk_space.pop()
-            to_distribute = min(left_file.free, right_file.files)
-            for _ in range(to_distribute):
-                output_queue.append(right_file.idx)
-            right_file.files -= to_distribute
-            left_file.free -= to_distribute
-            if right_file.files:
-                disk_space.append(right_file)
-    return output_queue
-
-
-def defragment_disk_files(disk_space=list[Disk]):
-    disks = deque(disk_space)
-    hold = deque()
-    to_check = len(disk_space)
-    while to_check:
-        append = False
-        to_check -= 1
-        disk = disks.pop()
-        for i in range(len(disks)):
-            if disk.files <= disks[i].free:
-                append = True
-                break
-        if append:
-            disks[-1].free += disk.free + disk.files
-            disks[i].free, disk.free = 0, disks[i].free - disk.files
-            disks.insert(i + 1, disk)
-        else:
-            hold.appendleft(disk)
-    disks.extend(hold)
-    return disks
-
-
-def transform_disk_queue_to_blocks(disk_queue: deque[Disk]) -> list[int]:
-    blocks = []
-    for disk in disk_queue:
-        for _ in range(disk.files):
-            blocks.append(disk.idx)
-        for _ in range(disk.free):
-            blocks.append(0)
-    return blocks
+def compact_disk_blocks(disk_space: list[Disk]) -> list[FileRun]:
+    """Move blocks one at a time from the end of the disk into the leftmost gap.
+
+    Files are split only where a gap runs out, so the result is a list of runs
+    in disk order and never holds more than two runs per file.
+    """
+    runs: list[FileRun] = []
+    left, right = 0, len(disk_space) - 1
+    remaining = disk_space[right].files if disk_space else 0
+    position = 0
+    while left < right:
+        disk = disk_space[left]
+        runs.append((disk.idx, position, disk.files))
+        position += disk.files
+        free = disk.free
+        while free and left < right:
+            moved = min(free, remaining)
+            if moved:
+                runs.append((disk_space[right].idx, position, moved))
+            position += moved
+            free -= moved
+            remaining -= moved
+            if not remaining:
+                right -= 1
+                remaining = disk_space[right].files
+        left += 1
+    if left == right:
+        runs.append((disk_space[right].idx, position, remaining))
+    return runs
+
+
+def span_checksum(file_id: int, start: int, length: int) -> int:
+    """Checksum of ``length`` blocks of ``file_id`` starting at block ``start``"""
+    return file_id * (start * length + length * (length - 1) // 2)
+
+
+def runs_checksum(runs: Iterable[FileRun]) -> int:
+    return sum(span_checksum(*run) for run in runs)
+
+
+def compact_disk_files(disk_space: list[Disk]) -> list[FileRun]:
+    """Move whole files, highest id first, into the leftmost gap that fits.
+
+    Free gaps are kept in one min-heap of start positions per gap size, so the
+    leftmost gap a file fits in is the smallest head among the heaps for sizes
+    at least as large as the file. Returns where each file ends up, by id.
+    """
+    gaps: list[list[int]] = [[] for _ in range(MAX_SPAN + 1)]
+    runs: list[FileRun] = []
+    position = 0
+    for disk in disk_space:
+        runs.append((disk.idx, position, disk.files))
+        position += disk.files
+        if disk.free:
+            # Starts are added in increasing order, so each list stays a heap
+            gaps[disk.free].append(position)
+        position += disk.free
+
+    for i in range(len(runs) - 1, -1, -1):
+        file_id, start, length = runs[i]
+        gap_size, gap_start = 0, start
+        for size in range(max(length, 1), MAX_SPAN + 1):
+            if gaps[size] and gaps[size][0] < gap_start:
+                gap_size, gap_start = size, gaps[size][0]
+        if gap_size:
+            heappop(gaps[gap_size])
+            if gap_size > length:
+                heappush(gaps[gap_size - length], gap_start + length)
+            runs[i] = (file_id, gap_start, length)
+    return runs
+
+
+def iter_blocks(runs: Iterable[FileRun], free: int = 0) -> Iterator[int]:
+    """Lazily expand runs into one file id per block, ``free`` for empty blocks"""
+    position = 0
+    for file_id, start, length in sorted(runs, key=lambda run: run[1]):
+        for _ in range(start - position):
+            yield free
+        for _ in range(length):
+            yield file_id
+        position = start + length
 
 
 def example_a():
     fp = "./example/day09-example01.txt"
     data = parse_data(fp)
-    q = deque(map(int, "0099811188827773336446555566"))
-    defragmented = defragment_disk_blocks(data)
+    q = list(map(int, "0099811188827773336446555566"))
+    defragmented = list(iter_blocks(compact_disk_blocks(data)))
     try:
         assert q == defragmented
     except AssertionError:
@@ -95,34 +135,24 @@ def example_a():
     print(checksum_value, "= 1928")
 
 
-def part_a():
-    fp = "./data/day09.txt"
+def part_a(fp: str = "./data/day09.txt") -> int:
     disk_space = parse_data(fp)
-    defrag_disk = defragment_disk_blocks(disk_space)
-    cs = checksum(defrag_disk)
-    print(cs)
+    runs = compact_disk_blocks(disk_space)
+    cs = runs_checksum(runs)
+    return cs
 
 
 def example_b():
     fp = "./example/day09-example01.txt"
     data = parse_data(fp)
-    defragmented = defragment_disk_files(data)
-    blocks = transform_disk_queue_to_blocks(defragmented)
-    cs = checksum(blocks)
+    runs = compact_disk_files(data)
+    cs = runs_checksum(runs)
+    assert checksum(iter_blocks(runs)) == cs
     print(cs, "= 2858")
 
 
-def part_b():
-    fp = "./data/day09.txt"
+def part_b(fp: str = "./data/day09.txt") -> int:
     disk_space = parse_data(fp)
-    defragmented = defragment_disk_files(disk_space)
-    blocks = transform_disk_queue_to_blocks(defragmented)
-    cs = checksum(blocks)
-    print(cs)
-
-
-if __name__ == "__main__":
-    example_a()
-    part_a()
-    example_b()
-    part_b()
+    runs = compact_disk_files(disk_space)
+    cs = runs_checksum(runs)
+    return cs
@@ -1,104 +1,94 @@
-from collections import deque
-from string import digits
-from typing import Generator
+import numpy as np
 
-Coordinate = tuple[int, int]  # i, j or row, col
-TopoMap = list[list[int | str]]
+from aoc.cache import cached_parse
+from aoc.grid import Grid
 
+Coordinate = int  # flat index into TopoMap.buffer
+TopoMap = Grid  # heights stored as the ASCII digits "0"-"9"
 
-def get_next_direction(
-    coord: Coordinate,
-    directions: tuple[Coordinate] = ((-1, 0), (0, 1), (1, 0), (0, -1)),
-) -> Generator[Coordinate, None, None]:
-    for direction in directions:
-        yield coord[0] + direction[0], coord[1] + direction[1]
-
-
-def is_in_bounds(coord: Coordinate, topomap: TopoMap) -> bool:
-    return 0 <= coord[0] < len(topomap) and 0 <= coord[1] < len(topomap[0])
-
-
-def is_uphill(current_coordinate: Coordinate, nc: Coordinate, topomap: TopoMap) -> bool:
-    return (
-        topomap[nc[0]][nc[1]]
-        == topomap[current_coordinate[0]][current_coordinate[1]] + 1
-    )
+TRAILHEAD = ord("0")
+PEAK = ord("9")
+PEAK_REACH = PEAK - TRAILHEAD
+PEAK_TILE = 2 * PEAK_REACH + 1
 
 
+@cached_parse(version=2)
 def parse_data(fp: str) -> TopoMap:
-    out = []
-    with open(fp, "r") as f:
-        for row in f.readlines():
-            out.append([int(i) if i in digits else i for i in row.strip()])
-    return out
-
-
-def find_trailheads(tm: TopoMap) -> Generator[Coordinate, None, None]:
-    """Check the top row and sides of the topographic map for 0's."""
-    for i, row in enumerate(tm):
-        for j, col in enumerate(row):
-            if col == 0:
-                yield i, j
-
-
-def find_count_of_reachable_peaks(trailhead: Coordinate, topomap: TopoMap) -> int:
-    q = deque([trailhead])
-    seen: set[Coordinate] = set()
-    peaks_seen: set[Coordinate] = set()
-    while q:
-        current = q.popleft()
-        seen.add(current)
-        if topomap[current[0]][current[1]] == 9:
-            peaks_seen.add(current)
-            continue
-        for next_direction in get_next_direction(current):
-            if (
-                next_direction not in seen
-                and is_in_bounds(next_direction, topomap)
-                and is_uphill(current, next_direction, topomap)
-            ):
-                q.appendleft(next_direction)
-    return len(peaks_seen)
-
-
-def find_count_of_distinct_paths_to_peaks(
-    trailhead: Coordinate, topomap: TopoMap
-) -> int:
-    paths = set()
-    paths_to_peaks = set()
-    q: deque[tuple[tuple[Coordinate], ...]] = deque(((trailhead,),))
-    while q:
-        current_path = q.popleft()
-        current_position = current_path[-1]
-        paths.add(current_path)
-        if topomap[current_position[0]][current_position[1]] == 9:
-            paths_to_peaks.add(current_path)
-            continue
-        for next_position in get_next_direction(current_position):
-            if (
-                current_path + (next_position,) not in paths
-                and is_in_bounds(next_position, topomap)
-                and is_uphill(current_position, next_position, topomap)
-            ):
-                next_path = current_path + (next_position,)
-                q.append(next_path)
-    return len(paths_to_peaks)
+    return Grid.from_file(fp)
+
+
+def peak_bit(peak: Coordinate, topomap: TopoMap) -> int:
+    """Bit for a peak in a reachable-peaks mask.
+
+    Every peak reachable from a cell is within PEAK_REACH steps of it, so two
+    such peaks are less than PEAK_TILE apart on each axis and get distinct
+    bits from their position in a PEAK_TILE square tiling. Masks then stay
+    small however many peaks the map has.
+    """
+    x, y = topomap.position(peak)
+    return x % PEAK_TILE + y % PEAK_TILE * PEAK_TILE
+
+
+def sweep_trails(topomap: TopoMap) -> tuple[int, int]:
+    """Sum of trailhead scores and sum of trailhead ratings, in one sweep.
+
+    Heights are visited from the peaks down. Each cell's rating is the sum of
+    its uphill neighbours' ratings and its reachable peaks are the union of
+    theirs, kept as a big-int bitmask. Only the layer above the current height
+    is kept.
+    """
+    cells = topomap.buffer
+    offsets = topomap.orthogonal_offsets
+    peaks = topomap.find("9")
+    ratings = dict.fromkeys(peaks, 1)
+    reachable = {peak: 1 << peak_bit(peak, topomap) for peak in peaks}
+    for height in range(PEAK - 1, TRAILHEAD - 1, -1):
+        layer_ratings: dict[Coordinate, int] = {}
+        layer_reachable: dict[Coordinate, int] = {}
+        for coord in topomap.find(chr(height)):
+            rating, mask = 0, 0
+            for offset in offsets:
+                neighbour = coord + offset
+                if cells[neighbour] == height + 1 and neighbour in ratings:
+                    rating += ratings[neighbour]
+                    mask |= reachable[neighbour]
+            if rating:
+                layer_ratings[coord] = rating
+                layer_reachable[coord] = mask
+        ratings, reachable = layer_ratings, layer_reachable
+    score = sum(mask.bit_count() for mask in reachable.values())
+    return score, sum(ratings.values())
 
 
 def calculate_path_score(topomap: TopoMap) -> int:
-    trailheads = tuple(find_trailheads(topomap))
-    paths = []
-    for trailhead in trailheads:
-        paths.append(find_count_of_reachable_peaks(trailhead, topomap))
-    return sum(paths)
+    score, _ = sweep_trails(topomap)
+    return score
+
+
+def rate_trails(topomap: TopoMap) -> int:
+    """Sum of trailhead ratings, propagated one height layer at a time with NumPy.
+
+    Trail counts at height h + 1 are added onto their four neighbours by
+    shifted slices and kept only where the map is at height h. The grid's
+    sentinel border keeps the shifts inside the array.
+    """
+    heights = (topomap.cells - TRAILHEAD).view(np.int8).reshape(-1, topomap.stride)
+    counts = (heights == PEAK_REACH).astype(np.int64)
+    climbed = np.empty_like(counts)
+    at_height = np.empty(heights.shape, dtype=bool)
+    for height in range(PEAK_REACH - 1, -1, -1):
+        climbed[:] = 0
+        climbed[1:] += counts[:-1]
+        climbed[:-1] += counts[1:]
+        climbed[:, 1:] += counts[:, :-1]
+        climbed[:, :-1] += counts[:, 1:]
+        np.equal(heights, height, out=at_height)
+        np.multiply(climbed, at_height, out=counts)
+    return int(counts.sum())
 
 
 def calculate_path_rating(topomap: TopoMap) -> int:
-    trailheads = tuple(find_trailheads(topomap))
-    trail_counts = []
-    for trailhead in trailheads:
-        trail_counts.append(find_count_of_distinct_paths_to_peaks(trailhead, topomap))
-    return sum(trail_counts)
+    return rate_trails(topomap)
 
 
 def example_a():
@@ -128,11 +118,10 @@ def example_a():
     print(score, "= 36")
 
 
-def part_a():
-    fp = "./data/day10.txt"
+def part_a(fp: str = "./data/day10.txt") -> int:
     topomap = parse_data(fp)
     score = calculate_path_score(topomap)
-    print(score)
+    return score
 
 
 def example_b():
@@ -157,15 +146,7 @@ def example_b():
     print(score, "= 81")
 
 
-def part_b():
-    fp = "./data/day10.txt"
+def part_b(fp: str = "./data/day10.txt") -> int:
     topomap = parse_data(fp)
     score = calculate_path_rating(topomap)
-    print(score)
-
-
-if __name__ == "__main__":
-    example_a()
-    part_a()
-    example_b()
-    part_b()
+    return score
@@ -1,6 +1,14 @@
+from collections import Counter
+from collections import OrderedDict
 from collections import deque
-from functools import cache
+from pathlib import Path
+from typing import Iterator
+from typing import NamedTuple
 from typing import Sequence
+import math
+import sqlite3
+
+MEMO_SIZE = 1 << 20
 
 
 def parse_data(fp: str) -> list[int]:
@@ -8,28 +16,160 @@ def parse_data(fp: str) -> list[int]:
         return [*map(int, f.read().strip().split())]
 
 
-def get_evolved_stones_count(stones: Sequence[int], n_iterations: int) -> int:
+def count_digits(stone: int) -> int:
+    if stone < 10:
+        return 1
+    digits = int(math.log10(stone)) + 1
+    # log10 can land just either side of an integer for large stones
+    if stone < 10 ** (digits - 1):
+        return digits - 1
+    if stone >= 10**digits:
+        return digits + 1
+    return digits
+
+
+def blink(stone: int) -> tuple[int, ...]:
+    """The stones a single stone becomes after one blink"""
+    if stone == 0:
+        return (1,)
+    digits = count_digits(stone)
+    if digits % 2 == 0:
+        return divmod(stone, 10 ** (digits // 2))
+    return (stone * 2024,)
+
+
+def evolve_stone_counts(
+    stones: Sequence[int], n_iterations: int
+) -> Iterator[Counter[int]]:
+    """Yield the stone value -> multiplicity table after each blink.
+
+    Stones with the same value evolve identically, so each blink only does work
+    per distinct value and ``len`` of each table is what is held in memory.
+    """
+    counts = Counter(stones)
+    for _ in range(n_iterations):
+        next_counts: Counter[int] = Counter()
+        for stone, multiplicity in counts.items():
+            for next_stone in blink(stone):
+                next_counts[next_stone] += multiplicity
+        counts = next_counts
+        yield counts
+
+
+def count_stones_after_blinks(stones: Sequence[int], n_iterations: int) -> int:
+    counts = Counter(stones)
+    for counts in evolve_stone_counts(stones, n_iterations):
+        pass
+    return counts.total()
+
+
+def distinct_stones_per_blink(stones: Sequence[int], n_iterations: int) -> list[int]:
+    return [len(counts) for counts in evolve_stone_counts(stones, n_iterations)]
+
+
+class MemoInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class StoneMemo:
+    """LRU memo of (stone, blinks) -> number of stones, optionally kept on disk.
+
+    At most ``maxsize`` entries are held in memory, evicting the least recently
+    used. With a ``path``, every computed entry is also written to a SQLite
+    file and entries missing from memory are looked up there, so later runs
+    start from what earlier runs worked out. Call ``close`` (or use it as a
+    context manager) to commit them.
+    """
+
+    def __init__(self, maxsize: int = MEMO_SIZE, path: str | Path | None = None):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple[int, int], int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db: sqlite3.Connection | None = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            # Counts outgrow SQLite's 64-bit integers, so values are stored as text
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS stones"
+                " (stone TEXT, blinks INTEGER, count TEXT, PRIMARY KEY (stone, blinks))"
+            )
+
+    def __enter__(self) -> "StoneMemo":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, stone: int, blinks: int) -> int | None:
+        key = (stone, blinks)
+        count = self.entries.get(key)
+        if count is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return count
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT count FROM stones WHERE stone = ? AND blinks = ?",
+                (str(stone), blinks),
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                self._remember(key, int(row[0]))
+                return int(row[0])
+        self.misses += 1
+        return None
+
+    def put(self, stone: int, blinks: int, count: int) -> None:
+        self._remember((stone, blinks), count)
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO stones VALUES (?, ?, ?)",
+                (str(stone), blinks, str(count)),
+            )
+
+    def _remember(self, key: tuple[int, int], count: int) -> None:
+        self.entries[key] = count
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def info(self) -> MemoInfo:
+        return MemoInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def clear(self) -> None:
+        """Forget the in-memory entries and reset the counters"""
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+
+# Shared by every get_evolved_stones_count call that is not given its own memo
+STONE_MEMO = StoneMemo()
+
+
+def get_evolved_stones_count(
+    stones: Sequence[int], n_iterations: int, memo: StoneMemo | None = None
+) -> int:
+    memo = STONE_MEMO if memo is None else memo
 
-    @cache
     def count_evolved_stones(stone: int, n_iterations: int) -> int:
         if n_iterations == 0:
             return 1
-        else:
+        total = memo.get(stone, n_iterations)
+        if total is None:
             total = 0
-            if stone == 0:
-                total += count_evolved_stones(1, n_iterations - 1)
-            elif len(str(stone)) % 2 == 0:
-                num_str = str(stone)
-                new_num_lens = len(num_str) // 2
-                total += count_evolved_stones(
-                    int(num_str[new_num_lens:]), n_iterations - 1
-                )
-                total += count_evolved_stones(
-                    int(num_str[:new_num_lens]), n_iterations - 1
-                )
-            else:
-                total += count_evolved_stones(stone * 2024, n_iterations - 1)
-            return total
+            for next_stone in blink(stone):
+                total += count_evolved_stones(next_stone, n_iterations - 1)
+            memo.put(stone, n_iterations, total)
+        return total
 
     q = deque([(stone, n_iterations) for stone in stones])
     count = 0
@@ -55,22 +195,17 @@ def example_a():
     count = get_evolved_stones_count(data, 25)
     print(count, "= 55312")
 
-
-def part_a():
-    fp = "./data/day11.txt"
-    data = parse_data(fp)
-    count = get_evolved_stones_count(data, 25)
-    print(count)
+    count = count_stones_after_blinks(data, 25)
+    print(count, "= 55312")
 
 
-def part_b():
-    fp = "./data/day11.txt"
+def part_a(fp: str = "./data/day11.txt") -> int:
     data = parse_data(fp)
-    count = get_evolved_stones_count(data, 75)
-    print(count)
+    count = count_stones_after_blinks(data, 25)
+    return count
 
 
-if __name__ == "__main__":
-    example_a()
-    part_a()
-    part_b()
+def part_b(fp: str = "./data/day11.txt") -> int:
+    data = parse_data(fp)
+    count = count_stones_after_blinks(data, 75)
+    return count
@@ -1,205 +1,189 @@
-from collections import deque
-from itertools import product
-from typing import Generator
-from typing import Sequence
-
-DIRECTIONS = (complex(1, 0), complex(0, 1), complex(-1, 0), complex(0, -1))
-HORIZONTAL_DIRECTIONS = [complex(1, 0), complex(-1, 0)]
-VERTICAL_DIRECTIONS = [complex(0, -1), complex(0, 1)]
-DIRECTIONS_PERPENDICULAR = {
-    HORIZONTAL_DIRECTIONS[0]: VERTICAL_DIRECTIONS,
-    HORIZONTAL_DIRECTIONS[1]: VERTICAL_DIRECTIONS,
-    VERTICAL_DIRECTIONS[0]: HORIZONTAL_DIRECTIONS,
-    VERTICAL_DIRECTIONS[1]: HORIZONTAL_DIRECTIONS,
-}
-
-
-def parse_data(fp: str) -> tuple[dict[complex, str], tuple[int, int]]:
-    output = {}
-    with open(fp, "r") as f:
-        for y, row in enumerate(f.readlines()):
-            for x, val in enumerate(row.strip()):
-                output[complex(x, y)] = val
-    bounds = (x + 1, y + 1)
-    return output, bounds
-
-
-def next_directions(
-    start: complex, directions: tuple[complex, ...] = DIRECTIONS
-) -> Generator[complex, None, None]:
-    for direction in directions:
-        yield start + direction
-
-
-def find_adjacent_plots(
-    start: complex, garden_plots: dict[complex, str]
-) -> set[complex]:
-    seen: set[complex] = set()
-    adjacent: set[complex] = set()
-    q = deque([start])
-    plot_type = garden_plots[start]
-    seen.add(start)
-    adjacent.add(start)
-    while q:
-        current = q.popleft()
-        seen.add(current)
-        for direction in next_directions(current):
-            if direction not in seen and garden_plots.get(direction) == plot_type:
-                adjacent.add(direction)
-                q.appendleft(direction)
-    return adjacent
-
-
-def get_plot_areas(
-    garden_plots: dict[complex, str], bounds: tuple[int, int]
-) -> deque[set[complex]]:
-    seen = set()
-    plot_collections = deque()
-    x_max, y_max = bounds
-    for x, y in product(range(x_max), range(y_max)):
-        if complex(x, y) in seen:
-            continue
-        else:
-            plots = find_adjacent_plots(complex(x, y), garden_plots)
-            plot_collections.append(plots)
-            seen.update(plots)
-    return plot_collections
-
-
-def compute_plot_perimeter(plot: set[complex]) -> int:
-    perimeter = 0
-    for single_plot in plot:
-        for direction in next_directions(single_plot):
-            if direction not in plot:
-                perimeter += 1
-    return perimeter
-
-
-def get_full_plot_perimeters(plot_areas: Sequence[set[complex]]) -> list[int]:
-    perimeters = []
-    for area in plot_areas:
-        perimeters.append(compute_plot_perimeter(area))
-    return perimeters
-
-
-def traverse_fence_edge(
-    start: complex, area: set[complex], perpendicular_direction: complex
-) -> frozenset[tuple[complex, complex]]:
-    seen = set()
-    for parallel in DIRECTIONS_PERPENDICULAR[perpendicular_direction]:
-        q = deque()
-        q.append(start)
-        while q:
-            current = q.popleft()
-            seen.add((current, current + perpendicular_direction))
-            if (
-                current + parallel in area
-                and (current + parallel + perpendicular_direction) not in area
-            ):
-                current = current + parallel
-                q.append(current)
-    return frozenset(seen)
-
-
-def count_continuous_plot_edges(area: set[complex]) -> int:
-    """Part B to find continuous perimeters"""
-    edges: set[frozenset[tuple[complex, complex]]] = set()
-    for plot in area:
-        for direction in DIRECTIONS:
-            if plot + direction not in area:  # it's an edge
-                edges.add(traverse_fence_edge(plot, area, direction))
-    return len(edges)
-
-
-def get_continuous_plot_perimeters(plot_areas: Sequence[set[complex]]) -> list[int]:
-    perimeters = []
-    for area in plot_areas:
-        perimeters.append(count_continuous_plot_edges(area))
-    return perimeters
-
-
-def calculate_fence_price(
-    garden_plots: dict[complex, str], bounds: tuple[int, int]
-) -> int:
-    adjacent_plots = get_plot_areas(garden_plots, bounds)
-    perimeters = get_full_plot_perimeters(adjacent_plots)
-    total = 0
-    for adjacent_plot, perimeter in zip(adjacent_plots, perimeters):
-        total += len(adjacent_plot) * perimeter
-    return total
-
-
-def calculate_bulk_fence_price(
-    garden_plots: dict[complex, str], bounds: tuple[int, int]
-) -> int:
-    adjacent_plots = get_plot_areas(garden_plots, bounds)
-    perimeters = get_continuous_plot_perimeters(adjacent_plots)
-    total = 0
-    for adjacent_plot, perimeter in zip(adjacent_plots, perimeters):
-        total += len(adjacent_plot) * perimeter
-    return total
+import numpy as np
+
+from aoc.cache import cached_parse
+from aoc.grid import Grid
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+
+@cached_parse(version=2)
+def parse_data(fp: str) -> Grid:
+    return Grid.from_file(fp)
+
+
+def _label_runs(plots: np.ndarray) -> tuple[np.ndarray, int]:
+    """Label regions by union-find over the horizontal runs of each row.
+
+    Runs that touch a run of the same plant in the row below are joined by
+    hooking the larger root onto the smaller and then pointer jumping, a
+    whole array of joins at a time, until no join changes a root.
+    """
+    width = plots.shape[1]
+    flat = plots.ravel()
+    starts = np.empty(flat.size, dtype=bool)
+    starts[0] = True
+    np.not_equal(flat[1:], flat[:-1], out=starts[1:])
+    starts[::width] = True
+    run = np.cumsum(starts, dtype=np.int32)
+    run -= 1
+    n_runs = int(run[-1]) + 1
+
+    # One vertical join per pair of overlapping runs is enough
+    same = flat[:-width] == flat[width:]
+    new_pair = starts[:-width] | starts[width:]
+    new_pair[1:] |= ~same[:-1]
+    below = np.flatnonzero(same & new_pair)
+    upper, lower = run[below], run[below + width]
+
+    identity = np.arange(n_runs, dtype=np.int32)
+    parent = identity.copy()
+    while upper.size:
+        upper, lower = parent[upper], parent[lower]
+        apart = upper != lower
+        upper, lower = upper[apart], lower[apart]
+        parent[np.maximum(upper, lower)] = np.minimum(upper, lower)
+        children = np.flatnonzero(parent != identity)
+        linked = parent[children]
+        while True:
+            grandparent = parent[linked]
+            if np.array_equal(grandparent, linked):
+                break
+            parent[children] = linked = grandparent
+
+    is_root = parent == identity
+    run_labels = np.cumsum(is_root, dtype=np.int32)[parent]
+    return run_labels[run].reshape(plots.shape), int(np.count_nonzero(is_root))
+
+
+def _label_with_scipy(plots: np.ndarray) -> tuple[np.ndarray, int]:
+    labels = np.zeros(plots.shape, dtype=np.int32)
+    n_labels = 0
+    for plant in np.unique(plots):
+        plant_labels, n_plant_labels = ndimage.label(plots == plant)
+        region = plant_labels > 0
+        labels[region] = plant_labels[region] + n_labels
+        n_labels += n_plant_labels
+    return labels, n_labels
+
+
+def label_plots(garden_plots: Grid) -> tuple[np.ndarray, int]:
+    """Number each region from 1 and label every plot with its region.
+
+    Uses ``scipy.ndimage.label`` when scipy is installed. Runs are labelled
+    along whichever axis has fewer of them.
+    """
+    plots = garden_plots.to_array()
+    if ndimage is not None:
+        return _label_with_scipy(plots)
+    row_changes = np.count_nonzero(plots[:, 1:] != plots[:, :-1])
+    column_changes = np.count_nonzero(plots[1:] != plots[:-1])
+    if column_changes < row_changes:
+        labels, n_labels = _label_runs(np.ascontiguousarray(plots.T))
+        return labels.T, n_labels
+    return _label_runs(plots)
+
+
+def measure_plots(
+    labels: np.ndarray, n_labels: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Area, perimeter and number of sides of each region, indexed by label.
+
+    A region has as many sides as corners. A plot is at a corner of its region
+    on one of its diagonals when both neighbours towards that diagonal are in
+    other regions, or both are in its own region and the diagonal plot is not.
+    """
+    shape = labels.shape
+    padded = np.pad(labels, 1)
+
+    def shifted(dx: int, dy: int) -> np.ndarray:
+        return padded[1 + dy : 1 + dy + shape[0], 1 + dx : 1 + dx + shape[1]]
+
+    fences = np.zeros(shape, dtype=np.uint8)
+    for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+        fences += labels != shifted(dx, dy)
+    corners = np.zeros(shape, dtype=np.uint8)
+    for dx, dy in ((1, -1), (1, 1), (-1, 1), (-1, -1)):
+        across = labels == shifted(dx, 0)
+        along = labels == shifted(0, dy)
+        corners += ~(across | along)
+        corners += across & along & (labels != shifted(dx, dy))
+
+    flat_labels = labels.ravel()
+    areas = np.bincount(flat_labels, minlength=n_labels + 1)
+    perimeters, sides = (
+        np.bincount(flat_labels, weights=counts.ravel(), minlength=n_labels + 1).astype(
+            np.int64
+        )
+        for counts in (fences, corners)
+    )
+    areas[0] = perimeters[0] = sides[0] = 0
+    return areas, perimeters, sides
+
+
+def calculate_fence_price(garden_plots: Grid) -> int:
+    areas, perimeters, _ = measure_plots(*label_plots(garden_plots))
+    return int(areas @ perimeters)
+
+
+def calculate_bulk_fence_price(garden_plots: Grid) -> int:
+    areas, _, sides = measure_plots(*label_plots(garden_plots))
+    return int(areas @ sides)
 
 
 def part_a_examples():
     fp = r"./example/day12-example01.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_fence_price(data)
     print(fence_price, "= 140")
 
     fp = r"./example/day12-example02.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_fence_price(data)
     print(fence_price, "= 772")
 
     fp = r"./example/day12-example03.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_fence_price(data)
     print(fence_price, "= 1930")
 
 
-def part_a():
-    fp = r"./data/day12.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_fence_price(data, bounds)
-    print(fence_price)
+def part_a(fp: str = r"./data/day12.txt") -> int:
+    data = parse_data(fp)
+    fence_price = calculate_fence_price(data)
+    return fence_price
 
 
 def part_b_examples():
     fp = r"./example/day12-example01.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_bulk_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_bulk_fence_price(data)
     print(fence_price, "= 80")
 
     fp = r"./example/day12-example02.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_bulk_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_bulk_fence_price(data)
     print(fence_price, "= 436")
 
     fp = r"./example/day12-example04.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_bulk_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_bulk_fence_price(data)
     print(fence_price, "= 236")
 
     fp = r"./example/day12-example05.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_bulk_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_bulk_fence_price(data)
     print(fence_price, "= 368")
 
     fp = r"./example/day12-example03.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_bulk_fence_price(data, bounds)
+    data = parse_data(fp)
+    fence_price = calculate_bulk_fence_price(data)
     print(fence_price, "= 1206")
 
 
-def part_b():
-    fp = r"./data/day12.txt"
-    data, bounds = parse_data(fp)
-    fence_price = calculate_bulk_fence_price(data, bounds)
-    print(fence_price)
-
-
-if __name__ == "__main__":
-    part_a_examples()
-    part_a()
-    part_b_examples()
-    part_b()
+def part_b(fp: str = r"./data/day12.txt") -> int:
+    data = parse_data(fp)
+    fence_price = calculate_bulk_fence_price(data)
+    return fence_price
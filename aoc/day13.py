@@ -1,8 +1,16 @@
 from dataclasses import dataclass
 import heapq
-import re
 import time
 
+import numpy as np
+
+from aoc.cache import cached_parse
+from aoc.ingest import read_records
+
+PRIZE_OFFSET = 10000000000000
+A_COST = 3
+B_COST = 1
+
 
 @dataclass
 class Direction:
@@ -17,85 +25,97 @@ class Position:
     y: int
 
 
-@dataclass
 class ClawMachine:
-    A: Direction
-    B: Direction
-    Prize: Position
+    """View of one machine's row, (A x, A y, B x, B y, prize x, prize y)"""
 
+    __slots__ = ("row",)
 
-def parse_data(fp: str) -> list[ClawMachine]:
-    claw_machines = []
-    button_pattern = r"Button [AB]: X\+(\d+), Y\+(\d+)"
-    prize_pattern = r"Prize: X=(\d+), Y=(\d+)"
-    with open(fp, "r") as f:
-        for chunk in f.read().split("\n\n"):
-            button_a, button_b, prize = chunk.split("\n")
+    def __init__(self, row: np.ndarray):
+        self.row = row
 
-            button_a_match = re.match(button_pattern, button_a)
-            direction_a = Direction(*map(int, button_a_match.groups()), cost=3)
+    @property
+    def A(self) -> Direction:
+        return Direction(int(self.row[0]), int(self.row[1]), cost=A_COST)
 
-            button_b_match = re.match(button_pattern, button_b)
-            direction_b = Direction(*map(int, button_b_match.groups()), cost=1)
+    @property
+    def B(self) -> Direction:
+        return Direction(int(self.row[2]), int(self.row[3]), cost=B_COST)
 
-            prize_match = re.match(prize_pattern, prize)
-            prize_location = Position(*map(int, prize_match.groups()))
+    @property
+    def Prize(self) -> Position:
+        return Position(int(self.row[4]), int(self.row[5]))
 
-            claw_machines.append(ClawMachine(direction_a, direction_b, prize_location))
 
-    return claw_machines
+@cached_parse(version=2)
+def parse_data(fp: str) -> np.ndarray:
+    """All machines as an (n, 6) array of rows like ``ClawMachine`` views"""
+    return read_records(fp, 6, signed=False)
 
 
 def solve_machine(machine: ClawMachine, offset: int = 0) -> int:
     prize = Position(machine.Prize.x + offset, machine.Prize.y + offset)
     det = machine.A.x * machine.B.y - machine.A.y * machine.B.x
-    a = int((prize.x * machine.B.y - prize.y * machine.B.x) / det)
-    b = int((machine.A.x * prize.y - prize.x * machine.A.y) / det)
-    if (machine.A.x * a + machine.B.x * b, machine.A.y * a + machine.B.y * b) == (
-        prize.x,
-        prize.y,
-    ):
-        return int(a * 3 + b)
-    else:
+    if det == 0:
         return 0
+    a, a_remainder = divmod(prize.x * machine.B.y - prize.y * machine.B.x, det)
+    b, b_remainder = divmod(machine.A.x * prize.y - prize.x * machine.A.y, det)
+    if a_remainder or b_remainder or a < 0 or b < 0:
+        return 0
+    return a * machine.A.cost + b * machine.B.cost
+
+
+def solve_machines(
+    machines: np.ndarray, offset: int = 0, costs: tuple[int, int] = (A_COST, B_COST)
+) -> np.ndarray:
+    """Cheapest number of tokens to win each machine's prize, 0 if it can't be won.
+
+    Every machine is solved at once by Cramer's rule with exact integer
+    division. Values large enough to overflow int64 products are solved with
+    Python ints in an object array instead.
+    """
+    if len(machines):
+        largest_button = int(np.abs(machines[:, :4]).max())
+        largest_prize = int(np.abs(machines[:, 4:]).max()) + abs(offset)
+        largest_product = 2 * largest_button * max(largest_button, largest_prize)
+        if largest_product * (abs(costs[0]) + abs(costs[1])) > np.iinfo(np.int64).max:
+            machines = machines.astype(object)
+    ax, ay, bx, by = machines[:, :4].T
+    px, py = (machines[:, 4:] + offset).T
+    det = ax * by - ay * bx
+    # Parallel buttons have no unique solution and are treated as unwinnable
+    singular = det == 0
+    det = np.where(singular, 1, det)
+    a_numerator = px * by - py * bx
+    b_numerator = ax * py - px * ay
+    a, b = a_numerator // det, b_numerator // det
+    a_remainder, b_remainder = a_numerator - a * det, b_numerator - b * det
+    won = ~singular & (a_remainder == 0) & (b_remainder == 0) & (a >= 0) & (b >= 0)
+    return np.where(won, a * costs[0] + b * costs[1], 0)
 
 
 def example_a():
     fp = "./example/day13-example01.txt"
     data = parse_data(fp)
-    cost = solve_machine(data[0])
+    cost = solve_machine(ClawMachine(data[0]))
     print(cost, "= 280")
 
-    cost = solve_machine(data[1])
+    cost = solve_machine(ClawMachine(data[1]))
     print(cost, "= 0")
 
-    cost = solve_machine(data[2])
+    cost = solve_machine(ClawMachine(data[2]))
     print(cost, "= 200")
 
-    cost = solve_machine(data[3])
+    cost = solve_machine(ClawMachine(data[3]))
     print(cost, "= 0")
 
 
-def part_a():
-    fp = "./data/day13.txt"
+def part_a(fp: str = "./data/day13.txt") -> int:
     data = parse_data(fp)
-    total = 0
-    for machine in data:
-        total += solve_machine(machine)
-    print(total)
+    costs = solve_machines(data)
+    return int(costs.sum())
 
 
-def part_b():
-    fp = "./data/day13.txt"
+def part_b(fp: str = "./data/day13.txt") -> int:
     data = parse_data(fp)
-    total = 0
-    offset = 10000000000000
-    for machine in data:
-        total += solve_machine(machine, offset=offset)
-    print(total)
-
-
-if __name__ == "__main__":
-    example_a()
-    part_a()
-    part_b()
+    costs = solve_machines(data, offset=PRIZE_OFFSET)
+    return int(costs.sum())
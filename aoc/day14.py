@@ -1,30 +1,54 @@
-from collections import defaultdict
-import re
+from pathlib import Path
+from typing import Iterable
+import struct
+import zlib
+
 import numpy as np
 
+from aoc.cache import cached_parse
+from aoc.ingest import read_records
+
+DIMENSIONS = (101, 103)
+FRAMES_PER_BLOCK = 64
+# Canvases are mostly empty, so the fastest zlib level compresses them well
+FRAME_COMPRESSION_LEVEL = 1
+
+# Robot counts 1-9 are drawn as digits and anything larger as "*"
+GLYPHS = np.full(256, ord("*"), dtype=np.uint8)
+GLYPHS[0] = ord(".")
+GLYPHS[1:10] = np.frombuffer(b"123456789", dtype=np.uint8)
+
+# width, height, frames per block, frames, index offset
+FRAME_STORE_FOOTER = struct.Struct("<5q")
+
 
+@cached_parse()
 def parse_data(fp: str) -> np.ndarray:
-    output = []
-    pattern = r"p=(-?\d+),(-?\d+) v=(-?\d+),(-?\d+)"
-    with open(fp, "r") as f:
-        for line in f.readlines():
-            match = re.match(pattern, line)
-            p_x, p_y, v_x, v_y = map(int, match.groups())
-            output.append((p_x, p_y, v_x, v_y))
-    arr = np.array(output)
-    return arr
+    return read_records(fp, 4)
 
 
-def create_robot_str(configuration: np.ndarray, dims: tuple[int, int]) -> str:
+def count_robots(positions: np.ndarray, dims: tuple[int, int]) -> np.ndarray:
+    """Robots per cell as a (height, width) uint8 canvas, or (T, height, width)
+    for a (T, n, 2) stack of positions. Counts above 255 are clipped.
+    """
     width, height = dims
-    field = [["." for x in range(width)] for _ in range(height)]
-    positions = defaultdict(int)
-    for x, y in configuration[:, :2]:
-        positions[(x, y)] += 1
-    for (x, y), v in positions.items():
-        field[y][x] = str(v)
-    output_str = "\n".join(["".join(line) for line in field])
-    return output_str
+    frames = positions.reshape(-1, positions.shape[-2], 2)
+    cells = frames[..., 1] * width + frames[..., 0]
+    cells += np.arange(len(frames))[:, np.newaxis] * (width * height)
+    counts = np.bincount(cells.ravel(), minlength=len(frames) * width * height)
+    canvas = np.minimum(counts, 255).astype(np.uint8)
+    return canvas.reshape(positions.shape[:-2] + (height, width))
+
+
+def render_canvas(canvas: np.ndarray) -> str:
+    height, width = canvas.shape
+    text = np.full((height, width + 1), ord("\n"), dtype=np.uint8)
+    text[:, :width] = GLYPHS[canvas]
+    return text.tobytes()[:-1].decode()
+
+
+def create_robot_str(configuration: np.ndarray, dims: tuple[int, int]) -> str:
+    return render_canvas(count_robots(configuration[:, :2], dims))
 
 
 def print_robots(configuration: np.ndarray, dims: tuple[int, int]) -> None:
@@ -32,15 +56,123 @@ def print_robots(configuration: np.ndarray, dims: tuple[int, int]) -> None:
     print(output_str, sep="\r" * len(output_str))
 
 
-def advance_robots(robots: np.ndarray, dims: tuple[int, int]) -> np.ndarray:
+def positions_at(robots: np.ndarray, t: int, dims: tuple[int, int]) -> np.ndarray:
+    """Every robot's (x, y) after ``t`` seconds.
+
+    Positions repeat every ``dims`` seconds along each axis, so ``t`` is reduced
+    first and any ``t`` costs the same without overflowing.
+    """
+    steps = np.array([t % dims[0], t % dims[1]], dtype=robots.dtype)
+    return (robots[:, :2] + robots[:, 2:] * steps) % dims
+
+
+def positions_over(
+    robots: np.ndarray, times: Iterable[int], dims: tuple[int, int]
+) -> np.ndarray:
+    """Every robot's (x, y) at each of ``times``, as a (T, n, 2) array"""
+    steps = np.mod(np.fromiter(times, dtype=np.int64)[:, np.newaxis], dims)
+    steps = steps.astype(robots.dtype)
+    return (robots[:, :2] + robots[:, 2:] * steps[:, np.newaxis]) % dims
+
+
+def axis_variances(start: np.ndarray, velocity: np.ndarray, period: int) -> np.ndarray:
+    """Variance of the robots' coordinate on one axis at each time in one period"""
+    times = np.arange(period, dtype=start.dtype)[:, np.newaxis]
+    return ((start + velocity * times) % period).var(axis=1)
+
+
+def find_clustered_time(robots: np.ndarray, dims: tuple[int, int]) -> int:
+    """First time the robots are most tightly bunched on both axes at once.
+
+    Each axis repeats with its own period, so the time of least spread is found
+    for x and y separately over one period each and combined with the Chinese
+    remainder theorem.
+    """
     width, height = dims
-    robots[:, 0] += robots[:, 2]
-    robots[:, 1] += robots[:, 3]
-    robots[robots[:, 0] < 0, 0] += width
-    robots[robots[:, 0] >= width, 0] -= width
-    robots[robots[:, 1] < 0, 1] += height
-    robots[robots[:, 1] >= height, 1] -= height
-    return robots
+    x_time = int(axis_variances(robots[:, 0], robots[:, 2], width).argmin())
+    y_time = int(axis_variances(robots[:, 1], robots[:, 3], height).argmin())
+    return x_time + width * ((y_time - x_time) * pow(width, -1, height) % height)
+
+
+def write_frames(
+    fp: str | Path,
+    robots: np.ndarray,
+    times: Iterable[int],
+    dims: tuple[int, int],
+    frames_per_block: int = FRAMES_PER_BLOCK,
+) -> None:
+    """Write the robot canvas at each of ``times`` to a compressed frame store.
+
+    Canvases are zlib compressed ``frames_per_block`` at a time. The block
+    offsets and the time of every frame follow the blocks, and a fixed-size
+    footer locates them, so ``FrameStore`` can fetch any frame directly.
+    """
+    times = np.fromiter(times, dtype=np.int64)
+    offsets = [0]
+    with open(fp, "wb") as f:
+        for start in range(0, len(times), frames_per_block):
+            block_times = times[start : start + frames_per_block]
+            canvases = count_robots(positions_over(robots, block_times, dims), dims)
+            offsets.append(
+                offsets[-1]
+                + f.write(zlib.compress(canvases.tobytes(), FRAME_COMPRESSION_LEVEL))
+            )
+        f.write(np.array(offsets, dtype=np.int64).tobytes())
+        f.write(times.tobytes())
+        f.write(
+            FRAME_STORE_FOOTER.pack(*dims, frames_per_block, len(times), offsets[-1])
+        )
+
+
+class FrameStore:
+    """Random access to the frames in a file written by ``write_frames``"""
+
+    def __init__(self, fp: str | Path):
+        self.file = open(fp, "rb")
+        self.file.seek(-FRAME_STORE_FOOTER.size, 2)
+        (
+            self.width,
+            self.height,
+            self.frames_per_block,
+            n_frames,
+            index_offset,
+        ) = FRAME_STORE_FOOTER.unpack(self.file.read(FRAME_STORE_FOOTER.size))
+        n_blocks = -(-n_frames // self.frames_per_block)
+        self.file.seek(index_offset)
+        self.offsets = np.fromfile(self.file, dtype=np.int64, count=n_blocks + 1)
+        self.times = np.fromfile(self.file, dtype=np.int64, count=n_frames)
+        self._block_number = -1
+        self._block = np.empty((0, self.height, self.width), dtype=np.uint8)
+
+    def __enter__(self) -> "FrameStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, frame: int) -> np.ndarray:
+        """The (height, width) canvas of robot counts for one frame"""
+        if not -len(self) <= frame < len(self):
+            raise IndexError(frame)
+        block_number, index = divmod(frame % len(self), self.frames_per_block)
+        if block_number != self._block_number:
+            start, stop = self.offsets[block_number : block_number + 2]
+            self.file.seek(start)
+            data = zlib.decompress(self.file.read(stop - start))
+            self._block = np.frombuffer(data, dtype=np.uint8).reshape(
+                -1, self.height, self.width
+            )
+            self._block_number = block_number
+        return self._block[index]
+
+    def render(self, frame: int) -> str:
+        return render_canvas(self[frame])
+
+    def close(self) -> None:
+        self.file.close()
 
 
 def compute_quadrant_census(
@@ -63,53 +195,29 @@ def example_a():
     fp = "./example/day14-example02.txt"
     robots = parse_data(fp)
     dimensions = (11, 7)
-    print_robots(robots, dimensions)
-    for i in range(5):
-        robots = advance_robots(robots, dimensions)
-        print(i + 1)
-        print_robots(robots, dimensions)
+    frames = positions_over(robots, range(6), dimensions)
+    for i, positions in enumerate(frames):
+        if i:
+            print(i)
+        print_robots(positions, dimensions)
 
     fp = "./example/day14-example01.txt"
     robots = parse_data(fp)
     dimensions = (11, 7)  # 11 wide, 7 tall
-    for _ in range(100):
-        robots = advance_robots(robots, dimensions)
-    t_l, t_r, b_l, b_r = compute_quadrant_census(robots, dimensions)
+    positions = positions_at(robots, 100, dimensions)
+    t_l, t_r, b_l, b_r = compute_quadrant_census(positions, dimensions)
     safety_factor = t_l * t_r * b_l * b_r
-    print(safety_factor)
+    print(safety_factor, "= 12")
 
 
-def part_a():
-    fp = "./data/day14.txt"
+def part_a(fp: str = "./data/day14.txt") -> int:
     robots = parse_data(fp)
-    width = 101
-    height = 103
-    dimensions = (width, height)
-    for _ in range(100):
-        robots = advance_robots(robots, dimensions)
-    t_l, t_r, b_l, b_r = compute_quadrant_census(robots, dimensions)
+    positions = positions_at(robots, 100, DIMENSIONS)
+    t_l, t_r, b_l, b_r = compute_quadrant_census(positions, DIMENSIONS)
     safety_factor = t_l * t_r * b_l * b_r
-    print(safety_factor)
+    return safety_factor
 
 
-def part_b():
-    fp = "./data/day14.txt"
+def part_b(fp: str = "./data/day14.txt") -> int:
     robots = parse_data(fp)
-    width = 101
-    height = 103
-    dimensions = (width, height)
-    iterations = 0
-    output_file = "./output/robot_positions.txt"
-    with open(output_file, "a") as f:
-        for i in range(7000):
-            iterations += 1
-            robots = advance_robots(robots, dimensions)
-            print(iterations, sep="\n")
-            robot_str = create_robot_str(robots, dimensions)
-            f.write(f"Iteration {iterations}:\n{robot_str}\n\n")
-
-
-if __name__ == "__main__":
-    example_a()
-    part_a()
-    part_b()
+    return find_clustered_time(robots, DIMENSIONS)
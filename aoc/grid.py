@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import numpy as np
+
+SENTINEL = 0
+
+
+class Grid:
+    """Character grid stored row-major in a flat, sentinel-padded byte buffer.
+
+    Cells are addressed by their integer index into ``buffer`` and neighbours are
+    reached by adding an offset, e.g. one of ``orthogonal_offsets``. The grid is
+    surrounded by ``pad`` rows and columns of ``SENTINEL`` so stepping off an edge
+    lands on a sentinel cell instead of needing a bounds check.
+
+    ``buffer`` is a ``bytearray`` (or a byte ``memoryview``, e.g. onto shared
+    memory) for fast per-cell access from Python loops and ``cells`` is a NumPy
+    ``uint8`` view sharing the same memory.
+    """
+
+    __slots__ = ("buffer", "cells", "width", "height", "pad", "stride")
+
+    def __init__(
+        self, buffer: bytearray | memoryview, width: int, height: int, pad: int = 1
+    ):
+        self.buffer = buffer
+        self.cells = np.frombuffer(buffer, dtype=np.uint8)
+        self.width = width
+        self.height = height
+        self.pad = pad
+        self.stride = width + 2 * pad
+
+    def __reduce__(self):
+        return Grid, (self.buffer, self.width, self.height, self.pad)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, pad: int = 1) -> "Grid":
+        data = data.rstrip(b"\r\n")
+        row_length = data.find(b"\n") + 1 or len(data) + 1
+        width = row_length - 1 - data.startswith(b"\r\n", row_length - 2)
+        height = len(data) // row_length + 1
+        full_rows = (height - 1) * row_length
+        if len(data) - full_rows != width:
+            raise ValueError("grid rows are not all the same length")
+        raw = np.frombuffer(data, dtype=np.uint8)
+        grid = cls(
+            bytearray((height + 2 * pad) * (width + 2 * pad)), width, height, pad
+        )
+        rows = grid.to_array()
+        rows[:-1] = raw[:full_rows].reshape(height - 1, row_length)[:, :width]
+        rows[-1] = raw[full_rows:]
+        return grid
+
+    @classmethod
+    def from_text(cls, text: str, pad: int = 1) -> "Grid":
+        return cls.from_bytes(text.strip().encode(), pad=pad)
+
+    @classmethod
+    def from_file(cls, fp: str | Path, pad: int = 1) -> "Grid":
+        with open(fp, "rb") as f:
+            return cls.from_bytes(f.read(), pad=pad)
+
+    @property
+    def orthogonal_offsets(self) -> tuple[int, int, int, int]:
+        """Offsets to the north, east, south and west neighbours, clockwise"""
+        return -self.stride, 1, self.stride, -1
+
+    @property
+    def diagonal_offsets(self) -> tuple[int, int, int, int]:
+        """Offsets to the northeast, southeast, southwest and northwest neighbours"""
+        return 1 - self.stride, 1 + self.stride, self.stride - 1, -self.stride - 1
+
+    def offset(self, dx: int, dy: int) -> int:
+        return dx + dy * self.stride
+
+    def index(self, x: int, y: int) -> int:
+        return (y + self.pad) * self.stride + x + self.pad
+
+    def position(self, index: int) -> tuple[int, int]:
+        y, x = divmod(index, self.stride)
+        return x - self.pad, y - self.pad
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def in_bounds(self, index: int) -> bool:
+        return self.buffer[index] != SENTINEL
+
+    def find(self, value: str) -> list[int]:
+        return np.flatnonzero(self.cells == ord(value)).tolist()
+
+    def indices(self) -> list[int]:
+        """Indices of every cell inside the padding, row by row"""
+        return np.flatnonzero(self.cells != SENTINEL).tolist()
+
+    def to_array(self) -> np.ndarray:
+        """2-D view of the cells inside the padding; writes go to the grid"""
+        rows = self.cells.reshape(self.height + 2 * self.pad, self.stride)
+        return rows[self.pad : self.pad + self.height, self.pad : self.pad + self.width]
+
+    def copy(self) -> "Grid":
+        return Grid(bytearray(self.buffer), self.width, self.height, self.pad)
@@ -0,0 +1,91 @@
+from pathlib import Path
+import mmap
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 24
+
+ZERO, NINE, MINUS = b"0"[0], b"9"[0], b"-"[0]
+
+# int64 holds every 18 digit number
+MAX_DIGITS = 18
+POWERS_OF_TEN = 10 ** np.arange(MAX_DIGITS, dtype=np.int64)
+
+
+def parse_integers(
+    data: bytes | memoryview | np.ndarray, signed: bool = True
+) -> np.ndarray:
+    """Every integer in ``data``, in order, as an int64 array.
+
+    Digits are found and combined with array operations over the whole buffer
+    rather than number by number. With ``signed`` a "-" directly before a number
+    makes it negative; any other non-digit byte only separates numbers.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    digit_positions = np.flatnonzero((buffer >= ZERO) & (buffer <= NINE))
+    if not digit_positions.size:
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.diff(digit_positions, prepend=-2) != 1)
+    lengths = np.diff(starts, append=digit_positions.size)
+    if lengths.max() > MAX_DIGITS:
+        raise ValueError(f"integers longer than {MAX_DIGITS} digits do not fit int64")
+    places = np.repeat(starts + lengths - 1, lengths)
+    places -= np.arange(digit_positions.size)
+    digits = (buffer[digit_positions] - ZERO).astype(np.int64)
+    values = np.add.reduceat(digits * POWERS_OF_TEN[places], starts)
+    if signed:
+        first_digits = digit_positions[starts]
+        sign_positions = np.maximum(first_digits - 1, 0)
+        negative = (buffer[sign_positions] == MINUS) & (first_digits > 0)
+        np.negative(values, out=values, where=negative)
+    return values
+
+
+def _in_number(byte: int) -> bool:
+    return ZERO <= byte <= NINE or byte == MINUS
+
+
+def _chunk_end(buffer: memoryview, start: int, stop: int) -> int:
+    """Move ``stop`` so the chunk doesn't end partway through a number"""
+    if stop >= len(buffer):
+        return len(buffer)
+    end = stop
+    while end > start and _in_number(buffer[end - 1]):
+        end -= 1
+    if end > start:
+        return end
+    # The whole chunk is one number, so finish it instead
+    while stop < len(buffer) and _in_number(buffer[stop]):
+        stop += 1
+    return stop
+
+
+def read_integers(
+    fp: str | Path, signed: bool = True, chunk_size: int = CHUNK_SIZE
+) -> np.ndarray:
+    """Every integer in a file, memory mapped and parsed ``chunk_size`` bytes at a time"""
+    with open(fp, "rb") as f:
+        if not f.seek(0, 2):
+            return np.empty(0, dtype=np.int64)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = memoryview(mapped)
+            try:
+                chunks = []
+                start = 0
+                while start < len(buffer):
+                    stop = _chunk_end(buffer, start, start + chunk_size)
+                    chunks.append(parse_integers(buffer[start:stop], signed))
+                    start = stop
+            finally:
+                buffer.release()
+    return np.concatenate(chunks)
+
+
+def read_records(
+    fp: str | Path, fields: int, signed: bool = True, dtype: np.dtype = np.int64
+) -> np.ndarray:
+    """Every integer in a file as rows of ``fields`` values"""
+    values = read_integers(fp, signed)
+    if values.size % fields:
+        raise ValueError(f"{values.size} integers do not make rows of {fields}")
+    return values.reshape(-1, fields).astype(dtype, copy=False)
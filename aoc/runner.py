@@ -0,0 +1,206 @@
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+import argparse
+import importlib
+import json
+import os
+import multiprocessing as mp
+import pkgutil
+import re
+import resource
+import sys
+import time
+
+import aoc
+
+DATA_DIR = Path(__file__).parent / "data"
+MODULE_PATTERN = re.compile(r"day(\d{2})(\w*)")
+PARTS = ("part_a", "part_b")
+
+
+@dataclass(order=True)
+class Solver:
+    day: int
+    module: str
+    part: str
+
+    def default_input(self, data_dir: Path) -> Path:
+        return data_dir / f"day{self.day:02d}.txt"
+
+
+@dataclass
+class Measurement:
+    module: str
+    part: str
+    input: str
+    result: str | None
+    wall_time: float
+    cpu_time: float
+    peak_rss: int  # KiB
+    error: str | None = None
+
+
+def discover_solvers() -> list[Solver]:
+    solvers = []
+    for module_info in pkgutil.iter_modules(aoc.__path__):
+        match = MODULE_PATTERN.fullmatch(module_info.name)
+        if match is None:
+            continue
+        module = importlib.import_module(f"aoc.{module_info.name}")
+        for part in PARTS:
+            if callable(getattr(module, part, None)):
+                solvers.append(Solver(int(match.group(1)), module_info.name, part))
+    return sorted(solvers)
+
+
+def parse_day_selection(specs: Iterable[str]) -> set[int]:
+    """Parse day selections such as "6", "3-7" or "all" into day numbers"""
+    days: set[int] = set()
+    for spec in specs:
+        if spec == "all":
+            return set(range(1, 26))
+        first, _, last = spec.partition("-")
+        days.update(range(int(first), int(last or first) + 1))
+    return days
+
+
+def _cpu_time(usage: resource.struct_rusage) -> float:
+    return usage.ru_utime + usage.ru_stime
+
+
+def _run_solver(solver: Solver, fp: Path, conn) -> None:
+    module = importlib.import_module(f"aoc.{solver.module}")
+    solve = getattr(module, solver.part)
+    self_start = resource.getrusage(resource.RUSAGE_SELF)
+    children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+    wall_start = time.perf_counter()
+    result, error = None, None
+    try:
+        result = solve(fp)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - wall_start
+    self_end = resource.getrusage(resource.RUSAGE_SELF)
+    children_end = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_time = (
+        _cpu_time(self_end)
+        - _cpu_time(self_start)
+        + _cpu_time(children_end)
+        - _cpu_time(children_start)
+    )
+    peak_rss = max(self_end.ru_maxrss, children_end.ru_maxrss)
+    conn.send(
+        Measurement(
+            module=solver.module,
+            part=solver.part,
+            input=str(fp),
+            result=None if result is None else str(result),
+            wall_time=wall_time,
+            cpu_time=cpu_time,
+            peak_rss=peak_rss,
+            error=error,
+        )
+    )
+    conn.close()
+
+
+def measure(solver: Solver, fp: Path) -> Measurement:
+    """Run one solver in a fresh process so peak RSS and caches are per part"""
+    ctx = mp.get_context("spawn")
+    recv_conn, send_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_solver, args=(solver, fp, send_conn))
+    process.start()
+    send_conn.close()
+    try:
+        measurement = recv_conn.recv()
+    except EOFError:
+        measurement = Measurement(
+            solver.module, solver.part, str(fp), None, 0.0, 0.0, 0, "worker died"
+        )
+    process.join()
+    return measurement
+
+
+def format_table(measurements: Iterable[Measurement]) -> str:
+    header = ("module", "part", "result", "wall (s)", "cpu (s)", "peak RSS (MiB)")
+    rows = [header]
+    for m in measurements:
+        rows.append(
+            (
+                m.module,
+                m.part,
+                m.error if m.error else str(m.result),
+                f"{m.wall_time:.4f}",
+                f"{m.cpu_time:.4f}",
+                f"{m.peak_rss / 1024:.1f}",
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = []
+    for row in rows:
+        cells = [
+            cell.ljust(width) if i < 3 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ]
+        lines.append("  ".join(cells).rstrip())
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m aoc", description="Run and time Advent of Code solvers."
+    )
+    parser.add_argument(
+        "days",
+        nargs="*",
+        default=["all"],
+        help='days to run, e.g. "6", "3-7" or "all" (default: all)',
+    )
+    parser.add_argument("--part", choices=("a", "b"), help="only run part a or part b")
+    parser.add_argument("--module", help="only run the named module, e.g. day06mp")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        help="input file to use instead of <data-dir>/dayNN.txt",
+    )
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse inputs from scratch instead of using the parse cache",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.no_cache:
+        os.environ["AOC_NO_CACHE"] = "1"
+    days = parse_day_selection(args.days)
+    solvers = [
+        solver
+        for solver in discover_solvers()
+        if solver.day in days
+        and (args.part is None or solver.part == f"part_{args.part}")
+        and (args.module is None or solver.module == args.module)
+    ]
+    measurements = []
+    for solver in solvers:
+        fp = args.input or solver.default_input(args.data_dir)
+        if not fp.exists():
+            print(
+                f"skipping {solver.module}.{solver.part}: {fp} not found",
+                file=sys.stderr,
+            )
+            continue
+        measurements.append(measure(solver, fp.resolve()))
+
+    if args.format == "json":
+        print(json.dumps([asdict(m) for m in measurements], indent=2))
+    else:
+        print(format_table(measurements))
+    return 1 if any(m.error for m in measurements) else 0